@@ -4,15 +4,22 @@ Authentication manager for the Web UI.
 Manages MSAL device-code flow lifecycle, token caching,
 and session validation.  All state is stored in a module-level
 singleton so it survives across HTTP requests.
+
+``msal`` and ``requests`` are imported on first use so that importing this
+module (and booting the server) does not pay for them up front.
 """
 
+from __future__ import annotations
+
+import base64
+import json
 import os
 import threading
-import uuid
-from typing import Any, Dict, Optional, Tuple
-
-import msal
-import requests
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from secrets import token_hex
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
 
 from cli.teams_chat_export import (
     GRAPH_API_BASE_URL,
@@ -25,27 +32,198 @@ from cli.teams_chat_export import (
     validate_token,
 )
 
+if TYPE_CHECKING:
+    import msal
+    import requests
+
 # ── Module-level state ────────────────────────────────────────────────────
 
-_lock = threading.Lock()
+
+@dataclass(slots=True)
+class PendingFlow:
+    """A device-code flow awaiting user sign-in, with its polling state."""
+
+    app: msal.PublicClientApplication
+    flow: Dict[str, Any]
+    cache: msal.SerializableTokenCache
+    interval: float
+    next_poll_at: float
+    created_at: float
+    error_streak: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+# State locks are never held across MSAL / Graph network calls.
+_state_lock = threading.RLock()  # guards _access_token, _user_info, _token_meta
+_flows_lock = threading.Lock()  # guards _pending_flows
+_refresh_lock = threading.Lock()  # single-flights silent refreshes in _ensure_token
 _access_token: Optional[str] = None
 _user_info: Optional[Dict[str, Any]] = None
-_pending_flows: Dict[str, Dict[str, Any]] = {}  # flow_id → {app, flow, cache}
+_pending_flows: Dict[str, PendingFlow] = {}
+_token_meta: Dict[str, Any] = {}  # {"exp": float} for the current _access_token
+_creds_cache: Optional[Tuple[str, str]] = None  # (tenant_id, client_id)
+# PCA bound to the file token cache, reused for silent acquisition
+_silent_app: Optional[Tuple[msal.PublicClientApplication, msal.SerializableTokenCache]] = None
+
+# Shared HTTP session so Graph validation calls reuse pooled TLS connections
+_http: Optional[requests.Session] = None
+
+# Re-validate against Graph this many seconds before the JWT actually expires
+TOKEN_EXPIRY_SKEW = 60
+
+# Device-flow polling (RFC 8628): default and maximum interval in seconds,
+# and how many consecutive transport errors we tolerate before giving up.
+DEVICE_FLOW_DEFAULT_INTERVAL = 5
+DEVICE_FLOW_MAX_INTERVAL = 60
+DEVICE_FLOW_MAX_ERRORS = 5
+# Abandoned flows are dropped after the device-code lifetime (15 minutes)
+DEVICE_FLOW_TTL = 900
+
+
+# Variables _loaded_env took from .env, forgotten again by _reset_clients
+_env_from_file: Dict[str, str] = {}
+
+
+@lru_cache(maxsize=1)
+def _loaded_env() -> bool:
+    """Read ``.env`` into the environment once (again after ``_reset_clients``)."""
+    _env_from_file.update(load_env_file())
+    return True
 
 
 def _get_credentials() -> Tuple[str, str]:
-    """Return (tenant_id, client_id) from environment."""
-    load_env_file()
+    """Return (tenant_id, client_id) from environment, cached after the first read."""
+    global _creds_cache
+
+    with _state_lock:
+        if _creds_cache is not None:
+            return _creds_cache
+
+    _loaded_env()
     tenant_id = os.environ.get("TEAMS_TENANT_ID", "")
     client_id = os.environ.get("TEAMS_CLIENT_ID", "")
     if not tenant_id or not client_id:
         raise RuntimeError(
             "TEAMS_TENANT_ID and TEAMS_CLIENT_ID must be set in .env or environment."
         )
+    with _state_lock:
+        _creds_cache = (tenant_id, client_id)
     return tenant_id, client_id
 
 
+def _get_http() -> requests.Session:
+    """Return the shared Graph session, creating it on first use."""
+    global _http
+
+    with _state_lock:
+        if _http is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            session = requests.Session()
+            session.mount(
+                "https://",
+                HTTPAdapter(
+                    pool_connections=4,
+                    pool_maxsize=16,
+                    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504]),
+                ),
+            )
+            _http = session
+        return _http
+
+
+def _reset_silent_app() -> None:
+    """Drop the silent-acquire app so it is rebuilt from the token cache file."""
+    global _silent_app
+
+    with _state_lock:
+        _silent_app = None
+
+
+def _reset_clients() -> None:
+    """Forget cached credentials, ``.env`` values and the silent-acquire app."""
+    global _creds_cache
+
+    with _state_lock:
+        _creds_cache = None
+        # Drop what was read from .env so the next read sees edits to the
+        # file; variables set in the real environment are left alone
+        for key, value in _env_from_file.items():
+            if os.environ.get(key) == value:
+                del os.environ[key]
+        _env_from_file.clear()
+        _loaded_env.cache_clear()
+    _reset_silent_app()
+
+
+def _token_expiry(access_token: str) -> Optional[float]:
+    """
+    Return the ``exp`` claim (epoch seconds) of a JWT access token.
+
+    The signature is not verified – Graph does that – we only need to know
+    how long the token we already trust stays usable.  Returns ``None`` for
+    opaque or malformed tokens.
+    """
+    try:
+        payload = access_token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+        return float(claims["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+def _set_token(access_token: Optional[str], info: Optional[Dict[str, Any]]) -> None:
+    """Store the current token and user info. Caller must hold ``_state_lock``."""
+    global _access_token, _user_info
+    _access_token = access_token
+    _user_info = info
+    _token_meta.clear()
+    if access_token:
+        exp = _token_expiry(access_token)
+        if exp is not None:
+            _token_meta["exp"] = exp
+
+
+def _token_is_fresh() -> bool:
+    """True if the cached token is known to be valid for a while. Caller holds ``_state_lock``."""
+    exp = _token_meta.get("exp")
+    return bool(_access_token and _user_info and exp and time.time() < exp - TOKEN_EXPIRY_SKEW)
+
+
+def _token_usable() -> bool:
+    """True if a token is cached and not known to be expiring. Caller holds ``_state_lock``."""
+    exp = _token_meta.get("exp")
+    return bool(_access_token) and (exp is None or time.time() < exp - TOKEN_EXPIRY_SKEW)
+
+
+def _status_from_info(info: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    u = info or {}
+    return {
+        "authenticated": True,
+        "user_name": u.get("displayName"),
+        "user_email": u.get("mail") or u.get("userPrincipalName"),
+        "user_id": u.get("id"),
+    }
+
+
+def _poll_once(flow: Dict[str, Any]) -> bool:
+    """MSAL device-flow exit condition: return after the first token request."""
+    return True
+
+
+def _sweep_expired_flows() -> None:
+    """Drop pending flows older than ``DEVICE_FLOW_TTL``. Caller holds ``_flows_lock``."""
+    cutoff = time.monotonic() - DEVICE_FLOW_TTL
+    for flow_id in [fid for fid, e in _pending_flows.items() if e.created_at < cutoff]:
+        del _pending_flows[flow_id]
+
+
 def _build_app(cache: msal.SerializableTokenCache) -> msal.PublicClientApplication:
+    import msal
+
     tenant_id, client_id = _get_credentials()
     authority = f"https://login.microsoftonline.com/{tenant_id}"
     return msal.PublicClientApplication(
@@ -55,53 +233,92 @@ def _build_app(cache: msal.SerializableTokenCache) -> msal.PublicClientApplicati
     )
 
 
+def _get_silent_app() -> Tuple[msal.PublicClientApplication, msal.SerializableTokenCache]:
+    """
+    Return the shared PCA bound to the file token cache, building it once.
+
+    New device flows still get their own PCA and empty cache.
+    """
+    global _silent_app
+
+    with _state_lock:
+        if _silent_app is not None:
+            return _silent_app
+
+    cache = load_token_cache()
+    built = (_build_app(cache), cache)
+    with _state_lock:
+        if _silent_app is None:
+            _silent_app = built
+        return _silent_app
+
+
+def _acquire_silent() -> Optional[str]:
+    """
+    Acquire an access token from the file token cache without user interaction.
+
+    MSAL returns the cached token or redeems the refresh token; no Graph
+    validation call is made.  Returns ``None`` if nothing usable is cached.
+    """
+    try:
+        app, cache = _get_silent_app()
+        accounts = app.get_accounts()
+        if not accounts:
+            return None
+        result = app.acquire_token_silent(SCOPES, account=accounts[0])
+    except Exception:
+        return None
+    if not result or "access_token" not in result:
+        return None
+    save_token_cache(cache)
+    return result["access_token"]
+
+
 # ── Public API ────────────────────────────────────────────────────────────
 
 
+def get_cached_auth_status() -> Optional[Dict[str, Any]]:
+    """
+    Return the authenticated status if it can be answered from memory.
+
+    Pure CPU – safe to call from the event loop.  Returns ``None`` when a
+    network round-trip (validation or silent acquisition) is required.
+    """
+    with _state_lock:
+        if _token_is_fresh():
+            return _status_from_info(_user_info)
+    return None
+
+
 def get_auth_status() -> Dict[str, Any]:
     """
     Return current authentication status.
     Tries the in-memory token first, then the file-based cache.
     """
-    global _access_token, _user_info
-
-    with _lock:
-        # 1. Already have a good token?
-        if _access_token:
-            is_valid, info = validate_token(_access_token)
-            if is_valid:
-                if info:
-                    _user_info = info
-                return {
-                    "authenticated": True,
-                    "user_name": (_user_info or {}).get("displayName"),
-                    "user_email": (_user_info or {}).get("mail")
-                        or (_user_info or {}).get("userPrincipalName"),
-                    "user_id": (_user_info or {}).get("id"),
-                }
-
-        # 2. Try silent acquisition from file cache
-        try:
-            cache = load_token_cache()
-            app = _build_app(cache)
-            accounts = app.get_accounts()
-            if accounts:
-                result = app.acquire_token_silent(SCOPES, account=accounts[0])
-                if result and "access_token" in result:
-                    is_valid, info = validate_token(result["access_token"])
-                    if is_valid:
-                        _access_token = result["access_token"]
-                        _user_info = info
-                        save_token_cache(cache)
-                        return {
-                            "authenticated": True,
-                            "user_name": (info or {}).get("displayName"),
-                            "user_email": (info or {}).get("mail")
-                                or (info or {}).get("userPrincipalName"),
-                            "user_id": (info or {}).get("id"),
-                        }
-        except Exception:
-            pass
+    with _state_lock:
+        # 1. Already have a good token?  Skip the Graph round-trip while the
+        #    JWT is comfortably within its lifetime.
+        if _token_is_fresh():
+            return _status_from_info(_user_info)
+        token, cached_info = _access_token, _user_info
+
+    if token:
+        is_valid, info = validate_token(token, session=_get_http())
+        if is_valid:
+            info = info or cached_info
+            with _state_lock:
+                if _access_token == token:
+                    _set_token(token, info)
+            return _status_from_info(info)
+
+    # 2. Try silent acquisition from file cache
+    token = _acquire_silent()
+    if token:
+        is_valid, info = validate_token(token, session=_get_http())
+        if is_valid:
+            with _state_lock:
+                _set_token(token, info)
+            return _status_from_info(info)
 
     return {"authenticated": False}
 
@@ -112,6 +329,8 @@ def start_device_code_flow() -> Dict[str, str]:
 
     Returns dict with ``user_code``, ``verification_uri``, ``message``, ``flow_id``.
     """
+    import msal
+
     cache = msal.SerializableTokenCache()
     app = _build_app(cache)
     flow = app.initiate_device_flow(scopes=SCOPES)
@@ -119,9 +338,19 @@ def start_device_code_flow() -> Dict[str, str]:
     if "user_code" not in flow:
         raise RuntimeError("Failed to create device flow – check tenant/client IDs.")
 
-    flow_id = uuid.uuid4().hex
-    with _lock:
-        _pending_flows[flow_id] = {"app": app, "flow": flow, "cache": cache}
+    flow_id = token_hex(16)
+    now = time.monotonic()
+    entry = PendingFlow(
+        app=app,
+        flow=flow,
+        cache=cache,
+        interval=float(flow.get("interval") or DEVICE_FLOW_DEFAULT_INTERVAL),
+        next_poll_at=now,
+        created_at=now,
+    )
+    with _flows_lock:
+        _sweep_expired_flows()
+        _pending_flows[flow_id] = entry
 
     return {
         "user_code": flow["user_code"],
@@ -137,71 +366,116 @@ def poll_device_code_flow(flow_id: str) -> Dict[str, Any]:
 
     Returns ``{"status": "pending" | "success" | "error", ...}``.
     """
-    global _access_token, _user_info
-
-    with _lock:
+    with _flows_lock:
+        _sweep_expired_flows()
         entry = _pending_flows.get(flow_id)
     if not entry:
         return {"status": "error", "error": "Unknown flow_id"}
 
-    app: msal.PublicClientApplication = entry["app"]
-    flow = entry["flow"]
-    cache: msal.SerializableTokenCache = entry["cache"]
-
-    result = app.acquire_token_by_device_flow(flow, exit_condition=lambda flow: True)
+    # Serialise polls of the same flow; different flows poll concurrently.
+    if not entry.lock.acquire(blocking=False):
+        return {"status": "pending"}
+    try:
+        # Honour the server-issued interval: polls arriving early are
+        # answered locally without contacting Azure AD.
+        if time.monotonic() < entry.next_poll_at:
+            return {"status": "pending"}
+
+        # MSAL evaluates the exit condition before it sleeps, so this is a
+        # single POST to the token endpoint; MSAL still populates ``cache``
+        # with the refresh token that later silent acquisitions rely on.
+        try:
+            result = entry.app.acquire_token_by_device_flow(entry.flow, exit_condition=_poll_once)
+        except Exception as exc:
+            # A transport failure, not an answer from Azure AD: retried at the
+            # normal interval and reported as such, not as throttling
+            entry.error_streak += 1
+            result = {
+                "error": "network_error" if entry.error_streak >= DEVICE_FLOW_MAX_ERRORS else "transient_error",
+                "error_description": (
+                    f"Could not reach Azure AD ({entry.error_streak}/{DEVICE_FLOW_MAX_ERRORS}): {exc}"
+                ),
+            }
+        else:
+            entry.error_streak = 0
+
+        if result.get("error") == "slow_down":
+            entry.interval = min(entry.interval * 2, DEVICE_FLOW_MAX_INTERVAL)
+        entry.next_poll_at = time.monotonic() + entry.interval
+    finally:
+        entry.lock.release()
 
     if "access_token" in result:
-        with _lock:
-            _access_token = result["access_token"]
+        with _flows_lock:
             _pending_flows.pop(flow_id, None)
-        save_token_cache(cache)
+        with _state_lock:
+            _set_token(result["access_token"], None)
+        save_token_cache(entry.cache)
+        _reset_silent_app()
 
-        is_valid, info = validate_token(result["access_token"])
+        is_valid, info = validate_token(result["access_token"], session=_get_http())
         if info:
-            with _lock:
-                _user_info = info
+            with _state_lock:
+                if _access_token == result["access_token"]:
+                    _set_token(result["access_token"], info)
+        u = info or {}
         return {
             "status": "success",
-            "user_name": (info or {}).get("displayName"),
-            "user_email": (info or {}).get("mail") or (info or {}).get("userPrincipalName"),
+            "user_name": u.get("displayName"),
+            "user_email": u.get("mail") or u.get("userPrincipalName"),
         }
 
     error = result.get("error", "")
-    if error == "authorization_pending":
+    if error in ("authorization_pending", "slow_down"):
         return {"status": "pending"}
+    if error == "transient_error":
+        # Still pending, but tell the caller why the last poll failed
+        return {"status": "pending", "error": result["error_description"]}
 
     # Clean up on hard error
-    with _lock:
+    with _flows_lock:
         _pending_flows.pop(flow_id, None)
     return {"status": "error", "error": result.get("error_description", error)}
 
 
 def force_login() -> Dict[str, str]:
     """Clear all cached tokens and start a fresh device-code flow."""
-    global _access_token, _user_info
-
-    with _lock:
-        _access_token = None
-        _user_info = None
+    with _state_lock:
+        _set_token(None, None)
     clear_token_cache()
+    _reset_clients()
     return start_device_code_flow()
 
 
+def _ensure_token() -> Optional[str]:
+    """
+    Silently refresh the in-memory token from the token cache.
+
+    Concurrent callers share one refresh: whoever waits on ``_refresh_lock``
+    re-checks the token the winner stored before acquiring again.
+    """
+    with _refresh_lock:
+        with _state_lock:
+            if _token_usable():
+                return _access_token
+        token = _acquire_silent()
+        if token:
+            with _state_lock:
+                _set_token(token, _user_info)
+        return token
+
+
 def get_access_token() -> str:
     """
     Return a valid access token, raising if not authenticated.
     """
-    global _access_token
-
-    with _lock:
-        if _access_token:
+    with _state_lock:
+        if _token_usable():
             return _access_token
 
-    # Try cache
-    status = get_auth_status()
-    if status.get("authenticated"):
-        with _lock:
-            if _access_token:
-                return _access_token
+    # Missing or expiring: silently refresh from the token cache
+    token = _ensure_token()
+    if token:
+        return token
 
     raise RuntimeError("Not authenticated. Please log in first.")
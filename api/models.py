@@ -6,7 +6,7 @@ from datetime import datetime
 from enum import Enum
 from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 # ── Enums ─────────────────────────────────────────────────────────────────
@@ -54,7 +54,7 @@ class DeviceCodePollResponse(BaseModel):
     status: str  # "pending", "success", "error"
     user_name: Optional[str] = None
     user_email: Optional[str] = None
-    error: Optional[str] = None
+    error: Optional[str] = None  # also set on "pending" after a network error
 
 
 class ForceLoginRequest(BaseModel):
@@ -86,6 +86,8 @@ class ListActiveChatsRequest(BaseModel):
 
 
 class RunResponse(BaseModel):
+    model_config = ConfigDict(use_enum_values=True)
+
     run_id: str
     action: ActionType
     status: RunStatus
@@ -93,6 +95,8 @@ class RunResponse(BaseModel):
 
 
 class RunStatusResponse(BaseModel):
+    model_config = ConfigDict(use_enum_values=True)
+
     run_id: str
     action: ActionType
     status: RunStatus
@@ -105,6 +109,8 @@ class RunStatusResponse(BaseModel):
 
 
 class RunHistoryItem(BaseModel):
+    model_config = ConfigDict(use_enum_values=True)
+
     run_id: str
     action: ActionType
     status: RunStatus
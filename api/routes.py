@@ -5,8 +5,13 @@ All endpoints follow a clean RESTful contract.
 Runs (jobs) return a token (run_id) that the front-end can poll.
 """
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+import hashlib
+from typing import Any, Dict, Optional
+
+import orjson
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import FileResponse, ORJSONResponse
+from starlette.concurrency import run_in_threadpool
 
 from api import auth_manager, run_manager
 from api.models import (
@@ -18,20 +23,55 @@ from api.models import (
     ListActiveChatsRequest,
     ListChatsRequest,
     ResultsResponse,
+    RunHistoryItem,
     RunHistoryResponse,
     RunResponse,
     RunStatusResponse,
 )
 
-router = APIRouter(prefix="/api")
+router = APIRouter(prefix="/api", default_response_class=ORJSONResponse)
+
+# run_manager stores action/status as enum instances, which orjson writes
+# as their values, so history items are projected to these fields as plain
+# dicts rather than round-tripped through pydantic.
+_RUN_HISTORY_FIELDS = tuple(RunHistoryItem.model_fields)
+
+
+class _ResultFileResponse(FileResponse):
+    """FileResponse that streams result files in 1 MiB reads instead of 64 KiB."""
+
+    chunk_size = 1024 * 1024
+
+
+def _etag_response(
+    request: Request,
+    payload: Dict[str, Any],
+    extra_headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """
+    Return ``payload`` as JSON with an ETag, or an empty 304 if the client
+    already has it.  ``Cache-Control: no-cache`` makes browsers revalidate
+    every poll, so unchanged polls cost a header exchange only.
+    """
+    body = orjson.dumps(payload)
+    etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache", **(extra_headers or {})}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 # ── Auth routes ───────────────────────────────────────────────────────────
 
 
 @router.get("/auth/status", response_model=AuthStatusResponse)
-def auth_status():
+async def auth_status(request: Request):
     """Check whether the current server session has a valid token."""
-    return auth_manager.get_auth_status()
+    # Cache hits are answered on the event loop; anything that needs
+    # MSAL or Graph is offloaded to the threadpool.
+    status = auth_manager.get_cached_auth_status()
+    if status is None:
+        status = await run_in_threadpool(auth_manager.get_auth_status)
+    return _etag_response(request, AuthStatusResponse(**status).model_dump())
 
 
 @router.post("/auth/device-code", response_model=DeviceCodeResponse)
@@ -44,9 +84,9 @@ def auth_device_code():
 
 
 @router.post("/auth/device-code/poll", response_model=DeviceCodePollResponse)
-def auth_device_code_poll(body: DeviceCodePollRequest):
+async def auth_device_code_poll(body: DeviceCodePollRequest):
     """Poll for device-code flow completion."""
-    return auth_manager.poll_device_code_flow(body.flow_id)
+    return await run_in_threadpool(auth_manager.poll_device_code_flow, body.flow_id)
 
 
 @router.post("/auth/force-login", response_model=DeviceCodeResponse)
@@ -139,12 +179,15 @@ def run_list_active_chats(body: ListActiveChatsRequest):
 
 
 @router.get("/runs/{run_id}/status", response_model=RunStatusResponse)
-def run_status(run_id: str):
+async def run_status(run_id: str, request: Request):
     """Poll the status of a run."""
-    info = run_manager.get_run_status(run_id)
+    # Runs owned by another process are read from SQLite; keep that off
+    # the event loop
+    info = await run_in_threadpool(run_manager.get_run_status, run_id)
     if not info:
         raise HTTPException(status_code=404, detail="Run not found")
-    return {
+    poll_hint = {"X-Poll-Interval-Ms": str(run_manager.compute_next_poll_ms(info))}
+    return _etag_response(request, {
         "run_id": run_id,
         "action": info["action"],
         "status": info["status"],
@@ -154,7 +197,7 @@ def run_status(run_id: str):
         "completed_at": info.get("completed_at"),
         "error": info.get("error"),
         "summary": info.get("summary"),
-    }
+    }, poll_hint)
 
 
 @router.get("/runs/{run_id}/download")
@@ -163,7 +206,7 @@ def run_download(run_id: str):
     fp = run_manager.get_result_file_path(run_id)
     if not fp:
         raise HTTPException(status_code=404, detail="Result file not found")
-    return FileResponse(
+    return _ResultFileResponse(
         path=str(fp),
         filename=fp.name,
         media_type="application/octet-stream",
@@ -180,20 +223,10 @@ def run_results(run_id: str):
 
 
 @router.get("/runs/history", response_model=RunHistoryResponse)
-def run_history():
+async def run_history():
     """Get run history."""
-    all_runs = run_manager.get_all_runs()
-    return {
-        "runs": [
-            {
-                "run_id": r["run_id"],
-                "action": r["action"],
-                "status": r["status"],
-                "created_at": r["created_at"],
-                "completed_at": r.get("completed_at"),
-                "summary": r.get("summary"),
-            }
-            for r in all_runs
-        ],
-        "total": len(all_runs),
-    }
+    runs = [
+        {field: r.get(field) for field in _RUN_HISTORY_FIELDS}
+        for r in await run_in_threadpool(run_manager.get_all_runs)
+    ]
+    return ORJSONResponse({"runs": runs, "total": len(runs)})
@@ -2,20 +2,31 @@
 Background run / job manager.
 
 Each "run" is identified by a UUID token and executed on a background thread.
-Progress and results are stored in an in-memory dict that the status
-and download endpoints can query.
+Progress and results are kept in an in-memory dict for runs owned by this
+process and written through to ``api.run_store`` (SQLite), so the status,
+history and download endpoints also see runs from other worker processes
+and from before a restart.
 """
 
 import io
-import json
+import multiprocessing
 import os
 import sys
 import threading
+import time
 import uuid
-from collections import Counter
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import islice
+from operator import itemgetter
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import orjson
 
 from cli.teams_chat_export import (
     GraphAPIClient,
@@ -24,57 +35,292 @@ from cli.teams_chat_export import (
     find_chats_by_participants,
     html_to_text,
     parse_date,
+    prefetched_iter,
     process_message,
     export_to_json,
     load_env_file,
+    write_json_export,
+    write_txt_export,
 )
 
+from api import run_store
 from api.auth_manager import get_access_token
 from api.models import ActionType, RunStatus
 
-# ── In-memory store ───────────────────────────────────────────────────────
+# ── Run store ─────────────────────────────────────────────────────────────
+
+
+@dataclass(slots=True)
+class _RunEntry:
+    """A run's state dict plus the lock that guards it."""
 
+    data: Dict[str, Any]
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+# Runs started by this process.  ``_lock`` only serialises inserts into
+# ``_runs``; reading an existing key is atomic under the GIL, so status reads
+# and progress updates take just the per-run ``entry.lock`` and never contend
+# across runs.  Every change is also written through to ``run_store``.
 _lock = threading.Lock()
-_runs: Dict[str, Dict[str, Any]] = {}
+_runs: Dict[str, _RunEntry] = {}
 
 # Directory for result files (ephemeral, served via download endpoint)
 RESULTS_DIR = Path("./api_results")
 RESULTS_DIR.mkdir(exist_ok=True)
 
+# Buffer size for result files (default is 8 KiB)
+RESULT_WRITE_BUFFER = 64 * 1024
 
-def _update(run_id: str, **kwargs: Any) -> None:
+
+@contextmanager
+def _atomic_path(path: Path) -> Iterator[Path]:
+    """
+    Yield a temporary sibling of ``path`` to write the result into.
+
+    On success the temp file is fsynced and renamed over ``path``, so the
+    download endpoint never sees a partially written file; on error it is
+    removed.
+    """
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        yield tmp
+        fd = os.open(tmp, os.O_RDWR)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+# ── Message processing pool ───────────────────────────────────────────────
+
+# process_message is CPU-bound (HTML → text) and independent per message,
+# so large exports fan out across cores.  Below the threshold the pickling
+# round-trip costs more than it saves.
+PROCESS_POOL_MIN_MESSAGES = 1000
+PROCESS_POOL_CHUNKSIZE = 256
+# Chunks submitted ahead of the one being written out
+PROCESS_POOL_WINDOW = 2 * (os.cpu_count() or 1)
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+
+    with _process_pool_lock:
+        if _process_pool is None:
+            # "spawn": forking this multi-threaded server could copy held locks
+            _process_pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count(),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _process_pool
+
+
+def shutdown_process_pool() -> None:
+    """Stop the message-processing pool's child processes, if it was started."""
+    global _process_pool
+
+    with _process_pool_lock:
+        pool, _process_pool = _process_pool, None
+    if pool is not None:
+        pool.shutdown(cancel_futures=True)
+
+
+def _process_chunk(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [process_message(msg) for msg in messages]
+
+
+def _process_messages(messages: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """
+    Yield ``process_message`` results in order, in parallel for large batches.
+
+    Chunks are submitted as the writer consumes results, at most
+    ``PROCESS_POOL_WINDOW`` ahead, so only those chunks' pickled copies and
+    results are held at once (``Executor.map`` would submit them all up front).
+    """
+    if len(messages) < PROCESS_POOL_MIN_MESSAGES:
+        yield from map(process_message, messages)
+        return
+    pool = _get_process_pool()
+    chunks = (
+        messages[i:i + PROCESS_POOL_CHUNKSIZE]
+        for i in range(0, len(messages), PROCESS_POOL_CHUNKSIZE)
+    )
+    pending = deque(pool.submit(_process_chunk, chunk) for chunk in islice(chunks, PROCESS_POOL_WINDOW))
+    while pending:
+        results = pending.popleft().result()
+        for chunk in islice(chunks, 1):
+            pending.append(pool.submit(_process_chunk, chunk))
+        yield from results
+
+
+# ── Run workers ───────────────────────────────────────────────────────────
+
+# Runs execute on a bounded pool; extra runs wait as "Queued" until a
+# worker frees up instead of each spawning its own thread.
+MAX_CONCURRENT_RUNS = 8
+_run_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_RUNS, thread_name_prefix="runmgr")
+
+# ── Poll-interval hints ───────────────────────────────────────────────────
+
+# Rolling EMA of start→completion seconds per action, seeded with typical
+# durations so the first run of each kind still gets a sensible hint.
+_EMA_ALPHA = 0.3
+_duration_ema: Dict[ActionType, float] = {
+    ActionType.EXPORT_CHAT: 30.0,
+    ActionType.LIST_CHATS: 10.0,
+    ActionType.LIST_ACTIVE_CHATS: 10.0,
+}
+
+_ema_lock = threading.Lock()
+
+MIN_POLL_MS = 500
+MAX_POLL_MS = 10_000
+
+
+def _record_duration(run: Dict[str, Any]) -> None:
+    """Fold a completed run's duration into its action's EMA."""
+    try:
+        started = datetime.fromisoformat(run["created_at"])
+    except (KeyError, ValueError):
+        return
+    elapsed = (datetime.now(timezone.utc) - started).total_seconds()
+    action = run["action"]
+    with _ema_lock:
+        prev = _duration_ema.get(action, elapsed)
+        _duration_ema[action] = prev + _EMA_ALPHA * (elapsed - prev)
+
+
+def compute_next_poll_ms(info: Dict[str, Any]) -> int:
+    """
+    Suggest how long the client should wait before polling ``info`` again.
+
+    Polls are spaced at a tenth of the expected remaining time, so they are
+    sparse early and dense near the expected completion.  Once a run
+    overruns its expected duration the interval grows with the overrun,
+    backing off on runs that have stalled.
+    """
+    if info.get("status") in (RunStatus.COMPLETED, RunStatus.FAILED, RunStatus.CANCELLED):
+        return MAX_POLL_MS
+    try:
+        started = datetime.fromisoformat(info["created_at"])
+    except (KeyError, ValueError):
+        return MIN_POLL_MS
+    elapsed = (datetime.now(timezone.utc) - started).total_seconds()
+    with _ema_lock:
+        expected = _duration_ema.get(info.get("action"), 10.0)
+    remaining = expected - elapsed
+    if remaining > 0:
+        interval = remaining * 0.1
+    else:
+        interval = -remaining * 0.25
+    return int(min(max(interval * 1000, MIN_POLL_MS), MAX_POLL_MS))
+
+
+def _register(run_id: str, data: Dict[str, Any]) -> None:
     with _lock:
-        if run_id in _runs:
-            _runs[run_id].update(kwargs)
+        _runs[run_id] = _RunEntry(data)
+    run_store.insert(run_id, data)
+
+
+def _update(run_id: str, **kwargs: Any) -> None:
+    entry = _runs.get(run_id)
+    if entry is None:
+        return
+    with entry.lock:
+        entry.data.update(kwargs)
+        completed = dict(entry.data) if kwargs.get("status") == RunStatus.COMPLETED else None
+    run_store.update(run_id, kwargs)
+    if completed is not None:
+        _record_duration(completed)
+
+
+def _from_store(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Restore enum fields on a run read back from ``run_store``."""
+    data["action"] = ActionType(data["action"])
+    data["status"] = RunStatus(data["status"])
+    return data
 
 
 def _get(run_id: str) -> Optional[Dict[str, Any]]:
-    with _lock:
-        return dict(_runs.get(run_id, {})) if run_id in _runs else None
+    entry = _runs.get(run_id)
+    if entry is None:
+        # Started by another worker process or before a restart
+        data = run_store.get(run_id)
+        return _from_store(data) if data is not None else None
+    with entry.lock:
+        return dict(entry.data)
+
+
+def _params(run_id: str) -> Dict[str, Any]:
+    """Return a run's params.  Workers read these once, at start."""
+    entry = _runs[run_id]
+    with entry.lock:
+        return entry.data["params"]
+
+
+# Minimum seconds between progress writes from a running worker
+PROGRESS_UPDATE_INTERVAL = 0.2
+
+
+def _progress_reporter(run_id: str) -> Callable[[int, str], None]:
+    """
+    Return ``report(progress, message)`` for a worker.
+
+    Calls within ``PROGRESS_UPDATE_INTERVAL`` of the last write are dropped,
+    so tight loops don't take the run lock per item.  Phase changes and the
+    final state still go through ``_update`` directly.
+    """
+    last = [float("-inf")]
+
+    def report(progress: int, message: str) -> None:
+        now = time.monotonic()
+        if now - last[0] < PROGRESS_UPDATE_INTERVAL:
+            return
+        last[0] = now
+        _update(run_id, progress=progress, progress_message=message)
+
+    return report
 
 
 # ── Public helpers ────────────────────────────────────────────────────────
 
+def recover_interrupted_runs() -> int:
+    """Fail runs left pending/running by a server process that has exited."""
+    return run_store.fail_orphaned(
+        "Interrupted by a server restart",
+        datetime.now(timezone.utc).isoformat(),
+    )
+
+
 def get_run_status(run_id: str) -> Optional[Dict[str, Any]]:
     return _get(run_id)
 
 
 def get_all_runs() -> List[Dict[str, Any]]:
-    with _lock:
-        return [
-            {
-                "run_id": rid,
-                "action": r["action"],
-                "status": r["status"],
-                "progress": r.get("progress", 0),
-                "progress_message": r.get("progress_message"),
-                "created_at": r["created_at"],
-                "completed_at": r.get("completed_at"),
-                "summary": r.get("summary"),
-                "error": r.get("error"),
-            }
-            for rid, r in sorted(_runs.items(), key=lambda x: x[1]["created_at"], reverse=True)
-        ]
+    # The store is written through on every change, so it is the complete
+    # history across processes; it returns rows newest first.
+    return [
+        {
+            "run_id": r["run_id"],
+            "action": ActionType(r["action"]),
+            "status": RunStatus(r["status"]),
+            "progress": r.get("progress") or 0,
+            "progress_message": r.get("progress_message"),
+            "created_at": r["created_at"],
+            "completed_at": r.get("completed_at"),
+            "summary": r.get("summary"),
+            "error": r.get("error"),
+        }
+        for r in run_store.list_runs()
+    ]
 
 
 def get_result_file_path(run_id: str) -> Optional[Path]:
@@ -100,6 +346,9 @@ def get_result_grid_data(run_id: str) -> Optional[Dict[str, Any]]:
 
 # ── Export Chat ───────────────────────────────────────────────────────────
 
+_EMPTY: Dict[str, Any] = {}  # read-only default for missing nested objects
+
+
 def start_export_chat(
     chat_id: str,
     since: str,
@@ -109,24 +358,22 @@ def start_export_chat(
     only_mine: bool,
 ) -> str:
     run_id = uuid.uuid4().hex
-    with _lock:
-        _runs[run_id] = {
-            "action": ActionType.EXPORT_CHAT,
-            "status": RunStatus.PENDING,
-            "progress": 0,
-            "progress_message": "Queued",
-            "created_at": datetime.now(timezone.utc).isoformat(),
-            "params": {
-                "chat_id": chat_id,
-                "since": since,
-                "until": until,
-                "format": fmt,
-                "exclude_system_messages": exclude_system_messages,
-                "only_mine": only_mine,
-            },
-        }
-    t = threading.Thread(target=_run_export_chat, args=(run_id,), daemon=True)
-    t.start()
+    _register(run_id, {
+        "action": ActionType.EXPORT_CHAT,
+        "status": RunStatus.PENDING,
+        "progress": 0,
+        "progress_message": "Queued",
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "params": {
+            "chat_id": chat_id,
+            "since": since,
+            "until": until,
+            "format": fmt,
+            "exclude_system_messages": exclude_system_messages,
+            "only_mine": only_mine,
+        },
+    })
+    _run_executor.submit(_run_export_chat, run_id)
     return run_id
 
 
@@ -136,8 +383,8 @@ def _run_export_chat(run_id: str) -> None:
         token = get_access_token()
         client = GraphAPIClient(token, verbose=False)
 
-        info = _get(run_id)
-        params = info["params"]
+        params = _params(run_id)
+        report = _progress_reporter(run_id)
 
         since_dt = parse_date(params["since"])
         until_dt = parse_date(params["until"]) if params["until"] else None
@@ -155,8 +402,7 @@ def _run_export_chat(run_id: str) -> None:
 
         def on_page(count: int) -> None:
             msg_count[0] += count
-            _update(run_id, progress=min(20 + msg_count[0] // 2, 85),
-                    progress_message=f"Downloaded {msg_count[0]} messages…")
+            report(min(20 + msg_count[0] // 2, 85), f"Downloaded {msg_count[0]} messages…")
 
         _update(run_id, progress=20, progress_message="Downloading messages…")
         messages, actual_until = get_chat_messages_filtered(
@@ -167,10 +413,10 @@ def _run_export_chat(run_id: str) -> None:
             params["only_mine"],
             my_user_id,
             params["exclude_system_messages"],
+            on_page=on_page,
         )
 
         _update(run_id, progress=85, progress_message="Processing messages…")
-        processed = [process_message(m) for m in messages]
 
         participants = [
             {
@@ -188,45 +434,53 @@ def _run_export_chat(run_id: str) -> None:
             "date_range_start": since_dt.isoformat(),
             "date_range_end": actual_until.isoformat(),
             "exported_at_utc": datetime.now(timezone.utc).isoformat(),
-            "message_count": len(processed),
-            "messages": processed,
+            "message_count": len(messages),  # process_message is one-to-one
+            "messages": [],
         }
 
+        # One pass builds the sender tally and the grid preview (first 50
+        # messages) while the processed messages are being written out.
+        sender_counts: Dict[str, int] = {}
+        count_of = sender_counts.get
+        grid_data: List[Dict[str, Any]] = []
+
+        def tallied(stream):
+            for p in stream:
+                sender = (p.get("from") or _EMPTY).get("displayName") or "Unknown"
+                sender_counts[sender] = count_of(sender, 0) + 1
+                if len(grid_data) < 50:
+                    grid_data.append({
+                        "id": p["id"],
+                        "created": p["createdDateTime"],
+                        "sender": sender,
+                        "body_text": p.get("body_text", "")[:300],
+                        "attachments": len(p.get("attachments") or ()),
+                    })
+                yield p
+
+        processed = tallied(_process_messages(messages))
+
         # Write file
         ext = params["format"]
         result_path = RESULTS_DIR / f"{run_id}.{ext}"
-        if ext == "json":
-            with open(result_path, "w", encoding="utf-8") as f:
-                json.dump(export_data, f, indent=2, ensure_ascii=False)
-        else:
-            # Reuse existing export function (writes to file)
-            from cli.teams_chat_export import export_to_txt
-            export_to_txt(export_data, str(result_path))
-
-        # Build grid data (top 50 messages)
-        sender_counter: Counter = Counter()
-        for m in processed:
-            sender_counter[m.get("from", {}).get("displayName", "Unknown")] += 1
-
-        grid_data = [
-            {
-                "id": m["id"],
-                "created": m["createdDateTime"],
-                "sender": m.get("from", {}).get("displayName", "Unknown"),
-                "body_text": m.get("body_text", "")[:300],
-                "attachments": len(m.get("attachments", [])),
-            }
-            for m in processed[:50]
-        ]
+        with _atomic_path(result_path) as tmp_path:
+            # Both formats are streamed message by message; the processed
+            # list is never materialised.
+            if ext == "json":
+                with open(tmp_path, "wb", buffering=RESULT_WRITE_BUFFER) as f:
+                    write_json_export(f, export_data, processed)
+            else:
+                with open(tmp_path, "w", encoding="utf-8", buffering=RESULT_WRITE_BUFFER) as f:
+                    write_txt_export(f, export_data, processed)
 
         summary = {
-            "total_messages": len(processed),
+            "total_messages": len(messages),
             "total_chats": 1,
             "date_range_start": since_dt.isoformat(),
             "date_range_end": actual_until.isoformat(),
             "top_senders": [
                 {"name": name, "count": count}
-                for name, count in sender_counter.most_common(10)
+                for name, count in sorted(sender_counts.items(), key=itemgetter(1), reverse=True)[:10]
             ],
             "chat_type": chat.get("chatType", "unknown"),
             "participants": [p["displayName"] for p in participants],
@@ -241,7 +495,7 @@ def _run_export_chat(run_id: str) -> None:
             result_file=str(result_path),
             summary=summary,
             grid_data=grid_data,
-            grid_total=len(processed),
+            grid_total=len(messages),
         )
 
     except Exception as exc:
@@ -255,6 +509,15 @@ def _run_export_chat(run_id: str) -> None:
         )
 
 
+# ── Chat listing helpers ──────────────────────────────────────────────────
+
+
+@lru_cache(maxsize=1024)
+def _members_display_name(names: tuple) -> str:
+    """Display name for an untitled chat; the same member sets recur across chats and runs."""
+    return ", ".join(names) or "(No name)"
+
+
 # ── List Chats ────────────────────────────────────────────────────────────
 
 def start_list_chats(
@@ -265,50 +528,67 @@ def start_list_chats(
     participants_filter: Optional[List[str]] = None,
 ) -> str:
     run_id = uuid.uuid4().hex
-    with _lock:
-        _runs[run_id] = {
-            "action": ActionType.LIST_CHATS,
-            "status": RunStatus.PENDING,
-            "progress": 0,
-            "progress_message": "Queued",
-            "created_at": datetime.now(timezone.utc).isoformat(),
-            "params": {
-                "chat_type": chat_type,
-                "max_participants": max_participants,
-                "topic_include": topic_include or [],
-                "topic_exclude": topic_exclude or [],
-                "participants": participants_filter or [],
-            },
-        }
-    t = threading.Thread(target=_run_list_chats, args=(run_id,), daemon=True)
-    t.start()
+    _register(run_id, {
+        "action": ActionType.LIST_CHATS,
+        "status": RunStatus.PENDING,
+        "progress": 0,
+        "progress_message": "Queued",
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "params": {
+            "chat_type": chat_type,
+            "max_participants": max_participants,
+            "topic_include": topic_include or [],
+            "topic_exclude": topic_exclude or [],
+            "participants": participants_filter or [],
+        },
+    })
+    _run_executor.submit(_run_list_chats, run_id)
     return run_id
 
 
-def _matches_filters(chat: Dict, members: Optional[list], filters: Dict) -> bool:
-    """Replicates filter logic from list_chats.py."""
+def _compile_filters(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Lower-case the keyword and participant filters once per run."""
+    return {
+        "chat_type": params["chat_type"],
+        "max_participants": params["max_participants"],
+        "topic_include": tuple(kw.lower() for kw in params["topic_include"]),
+        "topic_exclude": tuple(kw.lower() for kw in params["topic_exclude"]),
+        "participants": frozenset(p.lower() for p in params["participants"]),
+    }
+
+
+def _matches_chat_filters(chat: Dict, filters: Dict) -> bool:
+    """
+    Filters that need only the chat itself; checked before fetching members.
+
+    Together with ``_matches_member_filters`` this replicates the filter
+    logic from list_chats.py.  ``filters`` comes from ``_compile_filters``.
+    """
     chat_type = chat.get("chatType", "unknown")
 
     if filters["chat_type"] != "all" and chat_type != filters["chat_type"]:
         return False
 
-    if filters["max_participants"] is not None and members:
-        if len(members) > filters["max_participants"]:
-            return False
-
-    if filters["topic_include"]:
+    include, exclude = filters["topic_include"], filters["topic_exclude"]
+    if include or exclude:
         topic = (chat.get("topic") or "").lower()
-        if not any(kw.lower() in topic for kw in filters["topic_include"]):
+        if include and not any(kw in topic for kw in include):
+            return False
+        if exclude and any(kw in topic for kw in exclude):
             return False
 
-    if filters["topic_exclude"]:
-        topic = (chat.get("topic") or "").lower()
-        if any(kw.lower() in topic for kw in filters["topic_exclude"]):
+    return True
+
+
+def _matches_member_filters(members: Optional[list], filters: Dict) -> bool:
+    """Filters that need the chat's members."""
+    if filters["max_participants"] is not None and members:
+        if len(members) > filters["max_participants"]:
             return False
 
     if filters["participants"] and members:
-        emails = [m.get("email", "").lower() for m in members]
-        if not any(e.lower() in emails for e in filters["participants"]):
+        emails = {(m.get("email") or "").lower() for m in members}
+        if filters["participants"].isdisjoint(emails):
             return False
 
     return True
@@ -320,16 +600,23 @@ def _run_list_chats(run_id: str) -> None:
         token = get_access_token()
         client = GraphAPIClient(token, verbose=False)
 
-        info = _get(run_id)
-        filters = info["params"]
+        filters = _compile_filters(_params(run_id))
+        report = _progress_reporter(run_id)
 
         _update(run_id, progress=10, progress_message="Fetching chats…")
 
         results: List[Dict[str, Any]] = []
         total_processed = 0
 
-        for chat in client._paginate("/me/chats"):
+        # Only the fields used below, 50 per page (the /me/chats maximum)
+        api_params = {"$select": "id,chatType,topic", "$top": 50}
+        for chat in prefetched_iter(client._paginate("/me/chats", api_params)):
             total_processed += 1
+            # Cheap checks first: members are only fetched for chats that
+            # survive them (the results need the member count regardless).
+            if not _matches_chat_filters(chat, filters):
+                continue
+
             chat_id = chat.get("id", "")
             members = None
             try:
@@ -337,13 +624,12 @@ def _run_list_chats(run_id: str) -> None:
             except Exception:
                 pass
 
-            if not _matches_filters(chat, members, filters):
+            if not _matches_member_filters(members, filters):
                 continue
 
             topic = chat.get("topic")
             if not topic and members:
-                names = [m.get("displayName", "Unknown") for m in members if m.get("displayName")]
-                topic = ", ".join(names) if names else "(No name)"
+                topic = _members_display_name(tuple(filter(None, (m.get("displayName") for m in members))))
 
             results.append({
                 "chat_id": chat_id,
@@ -353,14 +639,14 @@ def _run_list_chats(run_id: str) -> None:
                 "member_count": len(members) if members else 0,
             })
 
-            if total_processed % 5 == 0:
-                _update(run_id, progress=min(10 + total_processed, 90),
-                        progress_message=f"Processed {total_processed} chats, {len(results)} match…")
+            report(min(10 + total_processed, 90),
+                   f"Processed {total_processed} chats, {len(results)} match…")
 
         # Write file
         result_path = RESULTS_DIR / f"{run_id}.json"
-        with open(result_path, "w", encoding="utf-8") as f:
-            json.dump({"chats": results, "total": len(results)}, f, indent=2, ensure_ascii=False)
+        with _atomic_path(result_path) as tmp_path:
+            with open(tmp_path, "wb", buffering=RESULT_WRITE_BUFFER) as f:
+                f.write(orjson.dumps({"chats": results, "total": len(results)}))
 
         grid_data = results[:50]
         summary = {"total_chats": len(results)}
@@ -390,38 +676,85 @@ def _run_list_chats(run_id: str) -> None:
 
 # ── List Active Chats ────────────────────────────────────────────────────
 
+# Concurrent member lookups per run; stays under requests' default
+# connection pool size (10) so pooled connections are reused.
+MEMBER_FETCH_WORKERS = 8
+
+
+def _try_get_chat_members(client: GraphAPIClient, chat_id: str) -> Optional[List[Dict[str, Any]]]:
+    """Return the chat's members, or ``None`` if they cannot be read."""
+    try:
+        return client.get_chat_members(chat_id)
+    except Exception:
+        return None
+
+
 def start_list_active_chats(
     min_activity_days: int = 365,
     max_meeting_participants: int = 10,
 ) -> str:
     run_id = uuid.uuid4().hex
-    with _lock:
-        _runs[run_id] = {
-            "action": ActionType.LIST_ACTIVE_CHATS,
-            "status": RunStatus.PENDING,
-            "progress": 0,
-            "progress_message": "Queued",
-            "created_at": datetime.now(timezone.utc).isoformat(),
-            "params": {
-                "min_activity_days": min_activity_days,
-                "max_meeting_participants": max_meeting_participants,
-            },
-        }
-    t = threading.Thread(target=_run_list_active_chats, args=(run_id,), daemon=True)
-    t.start()
+    _register(run_id, {
+        "action": ActionType.LIST_ACTIVE_CHATS,
+        "status": RunStatus.PENDING,
+        "progress": 0,
+        "progress_message": "Queued",
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "params": {
+            "min_activity_days": min_activity_days,
+            "max_meeting_participants": max_meeting_participants,
+        },
+    })
+    _run_executor.submit(_run_list_active_chats, run_id)
     return run_id
 
 
+def _preview_timestamp(chat: Dict[str, Any]) -> Optional[str]:
+    preview = chat.get("lastMessagePreview")
+    return preview.get("createdDateTime") if isinstance(preview, dict) else None
+
+
+def _last_activity(chat: Dict[str, Any]) -> Optional[datetime]:
+    """Parse the chat's last-message timestamp, or ``None`` if absent or invalid."""
+    dt_str = _preview_timestamp(chat)
+    if not dt_str:
+        return None
+    try:
+        return datetime.fromisoformat(dt_str.replace("Z", "+00:00"))
+    except Exception:
+        return None
+
+
+def _is_stale(chat: Dict[str, Any], cutoff: Optional[datetime], cutoff_iso: Optional[str]) -> bool:
+    """
+    True if the chat's last activity is before ``cutoff``.
+
+    Graph timestamps are UTC ("…Z") and so order correctly as strings
+    against ``cutoff_iso``; only other forms are parsed.
+    """
+    if cutoff is None:
+        return False
+    dt_str = _preview_timestamp(chat)
+    if not dt_str:
+        return False
+    if dt_str.endswith("Z"):
+        return dt_str < cutoff_iso
+    last_activity = _last_activity(chat)
+    return last_activity is not None and last_activity < cutoff
+
+
 def _run_list_active_chats(run_id: str) -> None:
     try:
         _update(run_id, status=RunStatus.RUNNING, progress=5, progress_message="Authenticating…")
         token = get_access_token()
         client = GraphAPIClient(token, verbose=False)
 
-        info = _get(run_id)
-        params = info["params"]
+        params = _params(run_id)
+        report = _progress_reporter(run_id)
         min_days = params["min_activity_days"]
         max_meeting = params["max_meeting_participants"]
+        cutoff = datetime.now(timezone.utc) - timedelta(days=min_days) if min_days else None
+        cutoff_iso = cutoff.strftime("%Y-%m-%dT%H:%M:%SZ") if cutoff else None
 
         _update(run_id, progress=10, progress_message="Fetching chats…")
 
@@ -429,43 +762,38 @@ def _run_list_active_chats(run_id: str) -> None:
         total = 0
 
         api_params = {"$select": "id,chatType,topic,lastMessagePreview"}
-        for chat in client._paginate("/me/chats", api_params):
+        with ThreadPoolExecutor(max_workers=MEMBER_FETCH_WORKERS) as pool:
+            # Member lookups are queued as chat pages arrive, so they overlap
+            # pagination and each other; results are consumed in chat order.
+            # Channels and stale chats are dropped before any member lookup.
+            pending = [
+                (chat, pool.submit(_try_get_chat_members, client, chat.get("id", "")))
+                for chat in prefetched_iter(client._paginate("/me/chats", api_params))
+                if chat.get("chatType", "unknown") != "channel"
+                and not _is_stale(chat, cutoff, cutoff_iso)
+            ]
+            fetched = []
+            for i, (chat, future) in enumerate(pending, 1):
+                fetched.append((chat, future.result()))
+                report(min(10 + i * 80 // len(pending), 90),
+                       f"Fetched members for {i}/{len(pending)} chats…")
+
+        for chat, members in fetched:
             total += 1
             chat_id = chat.get("id", "")
             chat_type = chat.get("chatType", "unknown")
 
-            if chat_type == "channel":
-                continue
-
-            members = None
-            try:
-                members = client.get_chat_members(chat_id)
-            except Exception:
+            if members is None:
                 continue
 
             if chat_type == "meeting" and max_meeting and members and len(members) > max_meeting:
                 continue
 
-            # Last activity
-            last_activity = None
-            preview = chat.get("lastMessagePreview")
-            if preview and isinstance(preview, dict):
-                dt_str = preview.get("createdDateTime")
-                if dt_str:
-                    try:
-                        last_activity = datetime.fromisoformat(dt_str.replace("Z", "+00:00"))
-                    except Exception:
-                        pass
-
-            if last_activity and min_days:
-                cutoff = datetime.now(timezone.utc) - timedelta(days=min_days)
-                if last_activity < cutoff:
-                    continue
+            last_activity = _last_activity(chat)
 
             topic = chat.get("topic")
             if not topic and members:
-                names = [m.get("displayName", "Unknown") for m in members if m.get("displayName")]
-                topic = ", ".join(names) if names else "(No name)"
+                topic = _members_display_name(tuple(filter(None, (m.get("displayName") for m in members))))
 
             results.append({
                 "chat_id": chat_id,
@@ -475,17 +803,16 @@ def _run_list_active_chats(run_id: str) -> None:
                 "last_activity": last_activity.isoformat() if last_activity else None,
             })
 
-            if total % 5 == 0:
-                _update(run_id, progress=min(10 + total, 90),
-                        progress_message=f"Processed {total} chats, {len(results)} active…")
+            report(min(10 + total, 90), f"Processed {total} chats, {len(results)} active…")
 
         # Sort by last activity descending
         results.sort(key=lambda x: x.get("last_activity") or "", reverse=True)
 
         # Write file
         result_path = RESULTS_DIR / f"{run_id}.json"
-        with open(result_path, "w", encoding="utf-8") as f:
-            json.dump({"chats": results, "total": len(results)}, f, indent=2, ensure_ascii=False)
+        with _atomic_path(result_path) as tmp_path:
+            with open(tmp_path, "wb", buffering=RESULT_WRITE_BUFFER) as f:
+                f.write(orjson.dumps({"chats": results, "total": len(results)}))
 
         grid_data = results[:50]
         summary = {"total_chats": len(results)}
@@ -0,0 +1,209 @@
+"""
+Persistent run store.
+
+Run state is written through to a SQLite database in WAL mode so runs
+survive restarts and are visible to every server worker process.  WAL lets
+status readers proceed while a worker writes progress; each write locks
+only for the duration of a single-row statement.
+
+Each thread gets its own connection (SQLite connections are not shared
+across threads).
+
+Every run records the process that executes it (``owner``), so a restarted
+worker can tell runs orphaned by a dead process from runs a live sibling
+worker is still executing.
+"""
+
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import orjson
+
+DB_PATH = Path(os.environ.get("RUNS_DB_PATH", "./api_results/runs.db"))
+
+# Columns holding JSON documents, stored as text
+_JSON_COLUMNS = frozenset({"params", "summary", "grid_data"})
+_COLUMNS = (
+    "run_id",
+    "action",
+    "status",
+    "progress",
+    "progress_message",
+    "created_at",
+    "completed_at",
+    "error",
+    "result_file",
+    "params",
+    "summary",
+    "grid_data",
+    "grid_total",
+    "owner",
+)
+# Columns needed for the history listing (skips the bulky grid/params)
+_HISTORY_COLUMNS = (
+    "run_id",
+    "action",
+    "status",
+    "progress",
+    "progress_message",
+    "created_at",
+    "completed_at",
+    "error",
+    "summary",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id           TEXT PRIMARY KEY,
+    action           TEXT NOT NULL,
+    status           TEXT NOT NULL,
+    progress         INTEGER NOT NULL DEFAULT 0,
+    progress_message TEXT,
+    created_at       TEXT NOT NULL,
+    completed_at     TEXT,
+    error            TEXT,
+    result_file      TEXT,
+    params           TEXT,
+    summary          TEXT,
+    grid_data        TEXT,
+    grid_total       INTEGER,
+    owner            TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_created_at ON runs (created_at);
+"""
+
+
+
+def _boot_id() -> str:
+    """Identify this boot of the machine, so PIDs from an earlier boot never match."""
+    try:
+        with open("/proc/sys/kernel/random/boot_id", encoding="ascii") as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+_BOOT_ID = _boot_id()
+
+_local = threading.local()
+_schema_lock = threading.Lock()
+_schema_ready = False
+
+
+def _connect() -> sqlite3.Connection:
+    """Return this thread's connection, creating it (and the schema) on first use."""
+    global _schema_ready
+
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        return conn
+
+    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(DB_PATH, isolation_level=None, timeout=10)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    with _schema_lock:
+        if not _schema_ready:
+            conn.executescript(_SCHEMA)
+            # Databases created before runs recorded their owner
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(runs)")}
+            if "owner" not in columns:
+                conn.execute("ALTER TABLE runs ADD COLUMN owner TEXT")
+            _schema_ready = True
+    _local.conn = conn
+    return conn
+
+
+def _encode(column: str, value: Any) -> Any:
+    if column in _JSON_COLUMNS and value is not None:
+        return orjson.dumps(value).decode("utf-8")
+    return value
+
+
+def _decode(row: sqlite3.Row) -> Dict[str, Any]:
+    data = {}
+    for column in row.keys():
+        value = row[column]
+        if column in _JSON_COLUMNS and value is not None:
+            value = orjson.loads(value)
+        data[column] = value
+    return data
+
+
+def insert(run_id: str, data: Dict[str, Any]) -> None:
+    """Store a new run, owned by the calling process."""
+    values = {c: _encode(c, data.get(c)) for c in _COLUMNS if c in data}
+    values["run_id"] = run_id
+    values["owner"] = f"{_BOOT_ID}:{os.getpid()}"
+    columns = ", ".join(values)
+    placeholders = ", ".join(f":{c}" for c in values)
+    _connect().execute(f"INSERT INTO runs ({columns}) VALUES ({placeholders})", values)
+
+
+def update(run_id: str, fields: Dict[str, Any]) -> None:
+    """Update the given columns of a run; unknown keys are ignored."""
+    values = {c: _encode(c, v) for c, v in fields.items() if c in _COLUMNS and c != "run_id"}
+    if not values:
+        return
+    assignments = ", ".join(f"{c} = :{c}" for c in values)
+    values["run_id"] = run_id
+    _connect().execute(f"UPDATE runs SET {assignments} WHERE run_id = :run_id", values)
+
+
+def get(run_id: str) -> Optional[Dict[str, Any]]:
+    """Return a run as a dict (without ``run_id``), or ``None`` if unknown."""
+    row = _connect().execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+    if row is None:
+        return None
+    data = _decode(row)
+    del data["run_id"]
+    return data
+
+
+def list_runs() -> List[Dict[str, Any]]:
+    """Return all runs for the history view, newest first."""
+    rows = _connect().execute(
+        f"SELECT {', '.join(_HISTORY_COLUMNS)} FROM runs ORDER BY created_at DESC"
+    ).fetchall()
+    return [_decode(row) for row in rows]
+
+
+def _owner_alive(owner: Optional[str]) -> bool:
+    """True if the process recorded as ``owner`` ("boot_id:pid") is still running."""
+    boot_id, _, pid = (owner or "").rpartition(":")
+    if boot_id != _BOOT_ID or not pid.isdigit():
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # Exists, but belongs to another user
+    return True
+
+
+def fail_orphaned(error: str, completed_at: str) -> int:
+    """
+    Mark pending or running runs whose owner process is gone as failed.
+
+    Their worker threads died with that process, so nothing will ever
+    finish them.  Runs owned by a live process (e.g. a sibling server
+    worker) are left alone.  Returns how many runs were failed.
+    """
+    conn = _connect()
+    rows = conn.execute(
+        "SELECT run_id, owner FROM runs WHERE status IN ('pending', 'running')"
+    ).fetchall()
+    orphaned = [row["run_id"] for row in rows if not _owner_alive(row["owner"])]
+    for run_id in orphaned:
+        conn.execute(
+            "UPDATE runs SET status = 'failed', progress = 100, progress_message = :error, "
+            "error = :error, completed_at = :completed_at "
+            "WHERE run_id = :run_id AND status IN ('pending', 'running')",
+            {"error": error, "completed_at": completed_at, "run_id": run_id},
+        )
+    return len(orphaned)
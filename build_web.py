@@ -2,19 +2,21 @@
 """Script to inject API_URL into index.html for Docker builds"""
 import os
 import sys
+from pathlib import Path
 
 api_url = os.environ.get("API_URL", "http://localhost:8000")
+index_path = Path("web/index.html")
 
 # Read index.html
-with open("web/index.html", "r") as f:
-    content = f.read()
+content = index_path.read_bytes()
 
-# Inject API_URL as a global variable before app.js loads
-injection = f'<script>window.API_BASE = "{api_url}";</script>'
-content = content.replace("</head>", f"{injection}\n</head>")
+# Inject API_URL as a global variable before app.js loads (first </head> only)
+injection = f'<script>window.API_BASE = "{api_url}";</script>\n</head>'.encode("utf-8")
+content = content.replace(b"</head>", injection, 1)
 
-# Write back
-with open("web/index.html", "w") as f:
-    f.write(content)
+# Write back atomically so a concurrent reader never sees a partial file
+tmp_path = index_path.with_name(index_path.name + ".tmp")
+tmp_path.write_bytes(content)
+os.replace(tmp_path, index_path)
 
 print(f"Injected API_URL: {api_url}")
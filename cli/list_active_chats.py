@@ -15,11 +15,14 @@ import argparse
 import io
 import os
 import sys
-from datetime import datetime, timedelta
+import time
+from dataclasses import dataclass
+from operator import attrgetter
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Iterator, Optional
 
-from .teams_chat_export import authenticate, GraphAPIClient, load_env_file
+from .teams_chat_export import authenticate, GraphAPIClient, iter_chats_with_members, load_cached_profile, load_env_file, prefetched_iter, save_cached_profile
 
 # Fix Windows console encoding issues with Unicode characters
 # Only do this in main context, not when imported as a module
@@ -29,6 +32,38 @@ if sys.platform == 'win32' and __name__ == '__main__':
     if hasattr(sys.stderr, 'buffer'):
         sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 
+# ISO 8601 parser for Graph timestamps: ciso8601 if installed, otherwise
+# fromisoformat, which accepts a trailing 'Z' natively from Python 3.11
+try:
+    from ciso8601 import parse_datetime as parse_iso_datetime
+except ImportError:
+    if sys.version_info >= (3, 11):
+        parse_iso_datetime = datetime.fromisoformat
+    else:
+        def parse_iso_datetime(value: str) -> datetime:
+            return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+# Local timezone, resolved once rather than per chat
+LOCAL_TZ = datetime.now().astimezone().tzinfo
+
+# Sorts chats with unknown activity last (timezone-aware, like Graph timestamps)
+DT_MIN = datetime.min.replace(tzinfo=timezone.utc)
+
+# Progress lines are redrawn every this many chats, or after this many seconds
+PROGRESS_EVERY = 25
+PROGRESS_INTERVAL = 0.25
+
+
+@dataclass(slots=True)
+class ChatRow:
+    """One chat in the output listing."""
+    name: str
+    type: str
+    last_activity: Optional[datetime]
+    sort_key: datetime  # last_activity, or DT_MIN when unknown
+    group_name: Optional[str]
+    chat_id: str
+
 
 def get_chat_last_activity(chat: Dict[str, Any]) -> Optional[datetime]:
     """
@@ -47,7 +82,7 @@ def get_chat_last_activity(chat: Dict[str, Any]) -> Optional[datetime]:
             if isinstance(preview, dict):
                 created_date_str = preview.get('createdDateTime')
                 if created_date_str:
-                    return datetime.fromisoformat(created_date_str.replace('Z', '+00:00'))
+                    return parse_iso_datetime(created_date_str)
     except Exception as e:
         # Silently skip errors
         pass
@@ -86,8 +121,24 @@ def get_chat_display_name(chat: Dict[str, Any], members: Optional[List[Dict[str,
     return '(No name)'
 
 
+def get_activity_cutoff(filters: Dict[str, Any]) -> Optional[datetime]:
+    """
+    Compute the last-activity cutoff for the ``min_activity_days`` filter.
+    
+    Args:
+        filters: Filter criteria dictionary
+        
+    Returns:
+        Timezone-aware cutoff datetime, or None if the filter is disabled
+    """
+    if not filters['min_activity_days']:
+        return None
+    return datetime.now(LOCAL_TZ) - timedelta(days=filters['min_activity_days'])
+
+
 def should_include_chat(chat: Dict[str, Any], members: Optional[List[Dict[str, Any]]], 
-                        last_activity: Optional[datetime], filters: Dict[str, Any]) -> bool:
+                        last_activity: Optional[datetime], filters: Dict[str, Any],
+                        cutoff: Optional[datetime] = None) -> bool:
     """
     Determine if a chat should be included based on filters.
     
@@ -96,30 +147,82 @@ def should_include_chat(chat: Dict[str, Any], members: Optional[List[Dict[str, A
         members: List of members
         last_activity: Last activity date
         filters: Filter criteria dictionary
+        cutoff: Precomputed ``get_activity_cutoff(filters)``; computed here
+            if omitted (pass it when checking many chats)
         
     Returns:
         True if chat should be included, False otherwise
     """
+    # Check last activity date cutoff (cheapest check, and the one that
+    # rejects most chats)
+    if last_activity and filters['min_activity_days']:
+        if cutoff is None:
+            cutoff = get_activity_cutoff(filters)
+        if last_activity < cutoff:
+            return False
+    
     chat_type = chat.get('chatType', 'unknown')
     
-    # Exclude channels
+    # Exclude channels (normally already filtered out by Graph)
     if chat_type == 'channel':
         return False
     
     # Check participant count limit for meetings
-    if chat_type == 'meeting' and members:
-        if filters['max_meeting_participants'] and len(members) > filters['max_meeting_participants']:
-            return False
-    
-    # Check last activity date cutoff
-    if last_activity and filters['min_activity_days']:
-        cutoff_date = datetime.now(last_activity.tzinfo or datetime.now().astimezone().tzinfo) - timedelta(days=filters['min_activity_days'])
-        if last_activity < cutoff_date:
+    if chat_type == 'meeting':
+        max_participants = filters['max_meeting_participants']
+        if max_participants and members and len(members) > max_participants:
             return False
     
     return True
 
 
+def is_older_than_cutoff(chat: Dict[str, Any], cutoff: Optional[datetime]) -> bool:
+    """
+    Check whether a chat's last activity is known and before the cutoff.
+    
+    Args:
+        chat: Chat object from Graph API
+        cutoff: Result of ``get_activity_cutoff``, or None
+        
+    Returns:
+        True if the chat is older than the cutoff
+    """
+    if cutoff is None:
+        return False
+    last_activity = get_chat_last_activity(chat)
+    return last_activity is not None and last_activity < cutoff
+
+
+def iter_active_chats(chats: Iterable[Dict[str, Any]], cutoff: Optional[datetime]) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the chats not known to be older than the cutoff.
+    
+    Chats must arrive ordered by ``lastMessagePreview/createdDateTime desc``.
+    Graph sorts chats without a preview after all dated ones, so once the
+    first older chat is seen the remaining dated chats are skipped without
+    further checks.  The listing is not shortened: it is read to the end
+    for undated chats.  What is saved is the member lookups for old dated
+    chats that Graph listed without inline members.
+    
+    Args:
+        chats: Chats from Graph API, newest first
+        cutoff: Result of ``get_activity_cutoff``, or None
+        
+    Yields:
+        Chats that are recent enough or have no known last activity
+    """
+    past_cutoff = False
+    for chat in chats:
+        preview = chat.get('lastMessagePreview')
+        if not (isinstance(preview, dict) and preview.get('createdDateTime')):
+            yield chat
+        elif not past_cutoff:
+            if is_older_than_cutoff(chat, cutoff):
+                past_cutoff = True
+            else:
+                yield chat
+
+
 def format_chat_line(chat_name: str, chat_type: str, last_activity: Optional[datetime], 
                      group_name: Optional[str] = None) -> str:
     """
@@ -245,7 +348,12 @@ Examples:
     client = GraphAPIClient(access_token, verbose=False)
     
     try:
-        user_profile = client.get_my_profile()
+        # authenticate() caches the profile when it validates a cached token,
+        # which makes this a file read on warm runs
+        user_profile = load_cached_profile(tenant_id, client_id)
+        if user_profile is None:
+            user_profile = client.get_my_profile()
+            save_cached_profile(tenant_id, client_id, user_profile)
         user_name = user_profile.get('displayName', 'Unknown')
         print_status(f"✓ Access verified for user: {user_name}")
     except Exception as e:
@@ -262,28 +370,45 @@ Examples:
     output_dir.mkdir(exist_ok=True)
     output_path = output_dir / output_filename
     
-    chats_data: List[Dict[str, Any]] = []
+    chats_data: List[ChatRow] = []
     chat_count = 0
+    cutoff = get_activity_cutoff(filters)
+    last_progress_ts = time.monotonic()
     
     try:
         print_status("Fetching chat list from Microsoft Graph API...")
         
-        # Retrieve all chats with lastMessagePreview
+        # Retrieve all chats with lastMessagePreview and members, newest first
         params = {
-            "$select": "id,chatType,topic,lastMessagePreview"
+            "$select": "id,chatType,topic,lastMessagePreview",
+            "$expand": "members",
+            "$orderby": "lastMessagePreview/createdDateTime desc"
         }
-        for chat in client._paginate("/me/chats", params):
+        # Channels are dropped server-side; should_include_chat still
+        # applies the same check in case Graph rejects the filter.  The
+        # activity cutoff is not pushed to Graph: it would also drop chats
+        # without a lastMessagePreview, which are kept.
+        filter_query = "chatType ne 'channel'"
+        
+        # Members come inline via $expand; chats without them are fetched in
+        # $batch groups rather than one request per chat.  The next page of
+        # chats is fetched on a background thread while this one is processed.
+        chats = prefetched_iter(client._paginate_with_filter("/me/chats", params, filter_query))
+        # Chats arrive newest first, so after the first one older than the
+        # cutoff only chats without a preview are passed on (and have their
+        # members fetched).  Every page is still read.
+        active_chats = iter_active_chats(chats, cutoff)
+        for chat, members, error in iter_chats_with_members(client, active_chats):
             chat_id = chat.get('id', 'N/A')
             chat_type = chat.get('chatType', 'unknown')
             
-            print_progress(f"  Fetching chat data: {chat_count + 1} chats retrieved")
+            now = time.monotonic()
+            if (chat_count + 1) % PROGRESS_EVERY == 0 or now - last_progress_ts > PROGRESS_INTERVAL:
+                print_progress(f"  Fetching chat data: {chat_count + 1} chats retrieved")
+                last_progress_ts = now
             
-            # Get members
-            members = None
-            try:
-                members = client.get_chat_members(chat_id)
-            except Exception as e:
-                error_str = str(e)
+            if error is not None:
+                error_str = str(error)
                 # Silently skip meeting chats with access restrictions
                 if 'meeting_' in chat_id and ('InsufficientPrivileges' in error_str or 'Access denied' in error_str):
                     continue
@@ -301,16 +426,17 @@ Examples:
             group_name = None
             
             # Apply filters
-            if not should_include_chat(chat, members, last_activity, filters):
+            if not should_include_chat(chat, members, last_activity, filters, cutoff):
                 continue
             
-            chats_data.append({
-                'name': chat_name,
-                'type': chat_type,
-                'last_activity': last_activity,
-                'group_name': group_name,
-                'chat_id': chat_id
-            })
+            chats_data.append(ChatRow(
+                name=chat_name,
+                type=chat_type,
+                last_activity=last_activity,
+                sort_key=last_activity or DT_MIN,
+                group_name=group_name,
+                chat_id=chat_id,
+            ))
             chat_count += 1
         
         print_progress("")  # Clear the progress line
@@ -318,10 +444,7 @@ Examples:
         print_status("Sorting chats by last activity date...")
         
         # Sort by last activity (most recent first), handling None values
-        chats_data.sort(
-            key=lambda x: x['last_activity'] if x['last_activity'] else datetime.min,
-            reverse=True
-        )
+        chats_data.sort(key=attrgetter('sort_key'), reverse=True)
         
         print_status("✓ Sorting complete")
         print_status("Writing output file...")
@@ -345,28 +468,27 @@ Examples:
             f.write(f"  - Channels: Excluded\n")
             f.write(f"{'='*100}\n\n")
             
-            # Write each chat
-            for i, chat_data in enumerate(chats_data, 1):
-                line = format_chat_line(
-                    chat_data['name'],
-                    chat_data['type'],
-                    chat_data['last_activity'],
-                    chat_data['group_name']
-                )
+            # Write each chat, keeping the lines for the console output and
+            # building the Chat ID reference in the same pass
+            lines: List[str] = []
+            id_ref_parts: List[str] = []
+            for i, row in enumerate(chats_data, 1):
+                line = format_chat_line(row.name, row.type, row.last_activity, row.group_name)
                 f.write(line + "\n")
+                lines.append(line)
+                id_ref_parts.append(f"{i}. {row.name}\n   Chat ID: {row.chat_id}\n\n")
                 
                 # Progress update
-                if i % 10 == 0 or i == len(chats_data):
+                now = time.monotonic()
+                if i % PROGRESS_EVERY == 0 or i == len(chats_data) or now - last_progress_ts > PROGRESS_INTERVAL:
                     print_progress(f"  Writing output: {i}/{len(chats_data)} chats written")
+                    last_progress_ts = now
             
             # Write footer
             f.write(f"\n{'='*100}\n")
             f.write(f"Chat ID reference (for use with teams_chat_export.py):\n")
             f.write(f"{'='*100}\n\n")
-            
-            for i, chat_data in enumerate(chats_data, 1):
-                f.write(f"{i}. {chat_data['name']}\n")
-                f.write(f"   Chat ID: {chat_data['chat_id']}\n\n")
+            f.writelines(id_ref_parts)
         
         print_progress("")  # Clear the progress line
         print_status(f"✓ Output saved to: {output_path.absolute()}")
@@ -376,14 +498,8 @@ Examples:
         print("Active Teams Chats - Sorted by Last Activity")
         print(f"{'='*100}\n")
         
-        for chat_data in chats_data:
-            line = format_chat_line(
-                chat_data['name'],
-                chat_data['type'],
-                chat_data['last_activity'],
-                chat_data['group_name']
-            )
-            print(line)
+        if lines:
+            print("\n".join(lines))
         
         return 0
     
@@ -7,39 +7,88 @@ This helps identify the correct chat ID format for the export tool.
 import argparse
 import io
 import os
+import re
 import sys
 from datetime import datetime
 from pathlib import Path
-from .teams_chat_export import authenticate, GraphAPIClient, load_env_file, clear_token_cache
+from .teams_chat_export import _odata_string, authenticate, GraphAPIClient, iter_chats_with_members, load_env_file, prefetched_iter, clear_token_cache
 
 # Fix Windows console encoding issues with Unicode characters
 if sys.platform == 'win32':
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 
-def format_chat_info(chat_num, chat, members):
-    """Format chat information as a string."""
-    chat_id = chat.get('id', 'N/A')
-    chat_type = chat.get('chatType', 'unknown')
-    topic = chat.get('topic', '(No topic)')
+OUTPUT_BUFFER_SIZE = 128 * 1024
+OUTPUT_FLUSH_EVERY = 50  # chats
+STDOUT_FLUSH_EVERY = 16  # chats
 
-    lines = []
-    lines.append(f"Chat #{chat_num}")
-    lines.append(f"  ID: {chat_id}")
-    lines.append(f"  Type: {chat_type}")
-    lines.append(f"  Topic: {topic}")
+# Output layout, built once
+SEP = "=" * 80
+HEADER = f"{SEP}\nTeams Chats List\n{SEP}\n\n"
 
+
+def encode_output(text):
+    """Encode output text once for both the console and the output file."""
+    if os.linesep != "\n":
+        text = text.replace("\n", os.linesep)
+    return text.encode("utf-8", errors="replace")
+
+
+def format_chat_info(chat_num, chat, members, members_skipped=False):
+    """Format chat information as a string, ending with a blank line."""
     if members:
-        lines.append(f"  Members ({len(members)}):")
-        for member in members:
-            display_name = member.get('displayName', 'N/A')
-            email = member.get('email', 'N/A')
-            lines.append(f"    - {display_name} ({email})")
+        members_block = f"  Members ({len(members)}):\n" + "".join(
+            f"    - {member.get('displayName', 'N/A')} ({member.get('email', 'N/A')})\n"
+            for member in members
+        )
+    elif members_skipped:
+        members_block = "  Members: (not fetched)\n"
     else:
-        lines.append(f"  Members: Error retrieving")
+        members_block = "  Members: Error retrieving\n"
+
+    return (
+        f"Chat #{chat_num}\n"
+        f"  ID: {chat.get('id', 'N/A')}\n"
+        f"  Type: {chat.get('chatType', 'unknown')}\n"
+        f"  Topic: {chat.get('topic', '(No topic)')}\n"
+        f"{members_block}\n"
+    )
 
-    lines.append("")
-    return "\n".join(lines)
+
+def compile_keywords(keywords):
+    """
+    Compile keywords into one case-insensitive pattern matching any of them.
+
+    Args:
+        keywords: List of literal keywords
+
+    Returns:
+        Compiled regex, or None if there are no keywords
+    """
+    if not keywords:
+        return None
+    return re.compile("|".join(map(re.escape, keywords)), re.IGNORECASE)
+
+
+def should_fetch_members(chat, filters, skip_meetings=False):
+    """
+    Decide whether a chat's members are worth a separate request.
+
+    Only called for chats Graph listed without inline members.  Meeting
+    chats are skipped when ``skip_meetings`` is set, unless a participant
+    filter needs their emails.
+
+    Args:
+        chat: Chat object from Graph API
+        filters: Dictionary of filter criteria
+        skip_meetings: Leave out members of meeting chats
+
+    Returns:
+        True if the members should be fetched
+    """
+    if filters['participants']:
+        return True
+    return not (skip_meetings and chat.get('chatType') == 'meeting')
 
 
 def matches_filters(chat, members, filters):
@@ -67,20 +116,20 @@ def matches_filters(chat, members, filters):
 
     # Topic inclusion filter (OR logic)
     if filters['topic_include']:
-        topic = chat.get('topic', '').lower()
-        if not any(keyword.lower() in topic for keyword in filters['topic_include']):
+        include_re = filters.get('topic_include_re') or compile_keywords(filters['topic_include'])
+        if not include_re.search(chat.get('topic') or ''):
             return False
 
     # Topic exclusion filter (OR logic - exclude if ANY keyword matches)
     if filters['topic_exclude']:
-        topic = chat.get('topic', '').lower()
-        if any(keyword.lower() in topic for keyword in filters['topic_exclude']):
+        exclude_re = filters.get('topic_exclude_re') or compile_keywords(filters['topic_exclude'])
+        if exclude_re.search(chat.get('topic') or ''):
             return False
 
     # Participant inclusion filter (OR logic)
     if filters['participants'] and members:
-        member_emails = [m.get('email', '').lower() for m in members]
-        if not any(email.lower() in member_emails for email in filters['participants']):
+        participant_set = filters.get('participant_set') or {p.lower() for p in filters['participants']}
+        if participant_set.isdisjoint((m.get('email') or '').lower() for m in members):
             return False
 
     return True
@@ -201,6 +250,17 @@ Examples:
         "--participants",
         help="Include chats with these participants (semicolon-separated emails, OR logic)"
     )
+    parser.add_argument(
+        "--no-members",
+        action="store_true",
+        help="Do not retrieve chat members (faster; --max-participants is not applied)"
+    )
+    parser.add_argument(
+        "--skip-meeting-members",
+        action="store_true",
+        help="Do not look up members of meeting chats Graph lists without them (faster; "
+             "--max-participants is not applied to those chats). Ignored with --participants."
+    )
     parser.add_argument(
         "--force-login",
         action="store_true",
@@ -208,6 +268,8 @@ Examples:
     )
 
     args = parser.parse_args()
+    if args.no_members and args.participants:
+        parser.error("--participants needs chat members and cannot be combined with --no-members")
 
     # Validate required credentials are provided
     if not args.tenant_id:
@@ -225,6 +287,11 @@ Examples:
         'topic_exclude': [k.strip() for k in args.topic_exclude.split(';')] if args.topic_exclude else [],
         'participants': [p.strip() for p in args.participants.split(';')] if args.participants else []
     }
+    # Precomputed once: keyword lists as one compiled pattern each, and
+    # participant emails as a lowercase set
+    filters['topic_include_re'] = compile_keywords(filters['topic_include'])
+    filters['topic_exclude_re'] = compile_keywords(filters['topic_exclude'])
+    filters['participant_set'] = {p.lower() for p in filters['participants']}
 
     print("Authenticating...")
     try:
@@ -239,7 +306,7 @@ Examples:
         return 1
 
     print("\nRetrieving your chats (streaming results as they arrive)...")
-    print(f"{'='*80}\n")
+    print(f"{SEP}\n")
 
     # Show active filters
     print_filter_summary(filters)
@@ -252,8 +319,8 @@ Examples:
         try:
             output_path = Path(args.save_output_to)
             output_path.parent.mkdir(parents=True, exist_ok=True)
-            output_file = open(output_path, 'w', encoding='utf-8')
-            header = f"{'='*80}\nTeams Chats List\n{'='*80}\n\n"
+            output_file = open(output_path, 'wb', buffering=OUTPUT_BUFFER_SIZE)
+            header = HEADER
 
             # Write filter summary to file
             if filters['chat_types'] != ['all'] or filters['max_participants'] is not None or \
@@ -271,7 +338,7 @@ Examples:
                     header += f"  - Participants (OR): {', '.join(filters['participants'])}\n"
                 header += "\n"
 
-            output_file.write(header)
+            output_file.write(encode_output(header))
             print(f"Writing to: {output_path.absolute()}\n")
         except Exception as e:
             print(f"Warning: Could not open output file: {e}", file=sys.stderr)
@@ -279,6 +346,19 @@ Examples:
     else:
         print("Console output only (no file will be created)\n")
 
+    # Records are encoded once and the bytes written to the console and the
+    # file alike (falls back to print if stdout has no binary buffer).
+    # Console records are collected and written STDOUT_FLUSH_EVERY at a time.
+    stdout_bytes = getattr(sys.stdout, 'buffer', None)
+    stdout_buf = bytearray()
+
+    def flush_stdout():
+        if stdout_buf:
+            sys.stdout.flush()  # Keep order with earlier print() output
+            stdout_bytes.write(stdout_buf)
+            stdout_bytes.flush()
+            stdout_buf.clear()
+
     chat_count = 0
     filtered_count = 0
     meeting_access_denied_count = 0  # Track meeting chats with restricted access
@@ -286,17 +366,39 @@ Examples:
     try:
         # Use the internal _paginate method to stream results
         total_processed = 0
-        for chat in client._paginate("/me/chats"):
+        # The chat type filter is pushed to Graph; matches_filters still
+        # applies it in case Graph rejects the $filter
+        filter_query = None
+        if filters['chat_types'] != ['all']:
+            filter_query = " or ".join(f"chatType eq {_odata_string(t)}" for t in filters['chat_types'])
+
+        # Members are the slow part; they come inline via $expand, and any
+        # chat missing them is fetched in $batch groups instead of one
+        # request per chat.  The next page of chats is fetched on a
+        # background thread while this one is processed.
+        # With --no-members nothing is expanded or fetched, and with
+        # --skip-meeting-members meeting chats Graph did not expand are not.
+        # Only the fields format_chat_info and the filters read are selected,
+        # 50 per page (the /me/chats maximum)
+        params = {"$select": "id,chatType,topic", "$top": 50}
+        if not args.no_members:
+            params["$expand"] = "members"
+
+        def fetch_members(chat):
+            if args.no_members:
+                return False
+            return should_fetch_members(chat, filters, args.skip_meeting_members)
+
+        chats = prefetched_iter(
+            client._paginate_with_filter("/me/chats", params, filter_query)
+        )
+        for chat, members, error in iter_chats_with_members(client, chats, fetch_members=fetch_members):
             total_processed += 1
             chat_id = chat.get('id', 'N/A')
             chat_type = chat.get('chatType', 'unknown')
 
-            # Get members (this is the slow part, but we do it per-chat as we go)
-            members = None
-            try:
-                members = client.get_chat_members(chat_id)
-            except Exception as e:
-                error_str = str(e)
+            if error is not None:
+                error_str = str(error)
                 # Silently count meeting chat access restrictions (known Graph API limitation)
                 if 'meeting_' in chat_id and ('InsufficientPrivileges' in error_str or 'Access denied' in error_str):
                     meeting_access_denied_count += 1
@@ -308,7 +410,8 @@ Examples:
                     continue
                 else:
                     # Other errors - show warning
-                    print(f"  Warning: Could not get members for chat {chat_id}: {e}")
+                    flush_stdout()
+                    print(f"  Warning: Could not get members for chat {chat_id}: {error}")
 
             # Apply filters
             if not matches_filters(chat, members, filters):
@@ -319,15 +422,27 @@ Examples:
             chat_count += 1
 
             # Format and output immediately
-            chat_info = format_chat_info(chat_count, chat, members)
-            print(chat_info)
+            chat_info = format_chat_info(
+                chat_count, chat, members,
+                members_skipped=members is None and error is None,
+            )
+            record = encode_output(chat_info)
+            if stdout_bytes is not None:
+                stdout_buf += record
+                if chat_count % STDOUT_FLUSH_EVERY == 0:
+                    flush_stdout()
+            else:
+                print(chat_info, end="")
 
             if output_file:
-                output_file.write(chat_info + "\n")
-                output_file.flush()  # Ensure it's written immediately
+                output_file.write(record)
+                # Flush periodically rather than per chat so a partial file
+                # is still visible during long runs
+                if chat_count % OUTPUT_FLUSH_EVERY == 0:
+                    output_file.flush()
 
         # Footer
-        footer = f"\n{'='*80}\n"
+        footer = f"\n{SEP}\n"
         footer += f"Total chats found: {chat_count}\n"
         if filtered_count > 0:
             footer += f"Chats filtered out: {filtered_count}\n"
@@ -335,20 +450,23 @@ Examples:
             footer += f"Meeting chats with restricted access: {meeting_access_denied_count}\n"
             footer += f"  (This is a known Microsoft Graph API limitation for meeting chats)\n"
         footer += f"Total chats processed: {total_processed}\n"
-        footer += f"{'='*80}\n"
+        footer += f"{SEP}\n"
         footer += "To export a specific chat, use the ID shown above with --chat-id\n"
-        footer += f"{'='*80}\n"
+        footer += f"{SEP}\n"
 
+        flush_stdout()
         print(footer)
         if output_file:
-            output_file.write(footer)
+            output_file.write(encode_output(footer))
 
     except Exception as e:
+        flush_stdout()
         print(f"\nError retrieving chats: {e}", file=sys.stderr)
         import traceback
         traceback.print_exc()
         return 1
     finally:
+        flush_stdout()
         if output_file:
             output_file.close()
             print(f"\nResults saved to: {Path(args.save_output_to).absolute()}")
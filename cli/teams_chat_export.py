@@ -6,33 +6,89 @@ Export Teams chat messages (1:1 and group chats) for a specified date range.
 Uses Microsoft Graph API with device code flow authentication.
 """
 
+from __future__ import annotations
+
 import argparse
+import gzip
+import importlib.util
 import json
 import os
+import queue
 import random
+import re
+import sqlite3
 import sys
+import threading
 import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
-from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
 from urllib.parse import quote, unquote
 
-import msal
 import requests
-from bs4 import BeautifulSoup
-import html2text
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+except ImportError:  # Optional: faster JSON decoding and export encoding
+    orjson = None
+
+if TYPE_CHECKING:
+    import msal
+
+
+# A percent-encoded byte, i.e. what unquote() would actually decode
+_PCT_RE = re.compile(r"%[0-9A-Fa-f]{2}")
+# A UTC Graph timestamp, e.g. "2025-06-01T10:00:00.123Z" (date, time)
+_GRAPH_UTC_RE = re.compile(r"(\d{4}-\d\d-\d\d)T(\d\d:\d\d:\d\d)(?:\.\d+)?Z")
+
+
+# Shared read-only stand-in for missing nested objects ("from": null, no
+# body), so lookups on them do not allocate a fresh dict per message
+_EMPTY: Dict[str, Any] = {}
+
+# The only member fields the exporters and listings read
+_MEMBER_FIELDS = ("userId", "displayName", "email")
+
+
+def _slim_members(members: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drop member fields nothing reads (roles, tenantId, @odata.type, ...)."""
+    return [{k: m[k] for k in _MEMBER_FIELDS if k in m} for m in members]
 
 
-def load_env_file(env_file: str = ".env") -> None:
+def _json_loads(data: bytes) -> Any:
+    """Decode a JSON response body, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps_pretty(data: Any) -> bytes:
+    """Encode data as indented UTF-8 JSON, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def load_env_file(env_file: str = ".env") -> Dict[str, str]:
     """
     Load environment variables from a .env file.
     
     Args:
         env_file: Path to .env file (default: .env in current directory)
+
+    Returns:
+        The variables that were set from the file (those already in the
+        environment are left alone and not included)
     """
+    loaded: Dict[str, str] = {}
     env_path = Path(env_file)
     if not env_path.exists():
-        return
+        return loaded
     
     try:
         with open(env_path, 'r') as f:
@@ -49,18 +105,39 @@ def load_env_file(env_file: str = ".env") -> None:
                     # Only set if not already in environment
                     if key and key not in os.environ:
                         os.environ[key] = value
+                        loaded[key] = value
     except Exception as e:
         print(f"Warning: Could not load .env file: {e}", file=sys.stderr)
+    return loaded
 
 # Constants
 GRAPH_API_BASE_URL = "https://graph.microsoft.com/v1.0"
 TOKEN_CACHE_FILE = ".token_cache.bin"
+PROFILE_CACHE_FILE = ".profile_cache.json"
+PROFILE_CACHE_TTL = 24 * 60 * 60  # seconds
+USER_CACHE_PATH = str(Path.home() / ".cache" / "teams-chat-extract" / "users.db")
+USER_CACHE_TTL = 24 * 60 * 60  # seconds
 SCOPES = [
     "Chat.Read",
     "User.ReadBasic.All"
 ]
 MAX_RETRIES = 5
+BATCH_MAX_REQUESTS = 20  # Graph JSON batching limit per $batch call
+CHAT_SELECT_FIELDS = "id,chatType,topic"  # $select for chat listings
+USER_FILTER_MAX_TERMS = 15  # Identifiers per combined /users $filter
+MEMBER_FETCH_WORKERS = 12  # Concurrent per-chat member requests
+BATCHES_IN_FLIGHT = 4  # Concurrent $batch member requests while listing chats
+MEMBERS_CACHE_SIZE = 4096  # Chats whose members are memoized per client
+HTTP_POOL_SIZE = 32  # Pooled keep-alive connections per host
+EXPORT_BUFFER_SIZE = 64 * 1024  # Write buffer for text exports
+ZSTD_LEVEL = 3  # Compression level for .zst JSON exports
+GZIP_LEVEL = 6  # Compression level for .gz JSON exports
+MESSAGE_FETCH_WORKERS = 4  # Chats whose messages are fetched concurrently
+HTML_CACHE_SIZE = 2048  # Recent message bodies whose text conversion is reused
 DEFAULT_BACKOFF_BASE = 2  # seconds
+THROTTLE_MAX_RATE = 20.0  # requests/s at which pacing switches off again
+THROTTLE_MIN_RATE = 0.5  # requests/s floor while throttled
+THROTTLE_RATE_STEP = 0.5  # requests/s regained per successful request
 
 # Exit codes
 EXIT_SUCCESS = 0
@@ -88,6 +165,11 @@ class NotFoundError(TeamsExportError):
     pass
 
 
+class BadRequestError(TeamsExportError):
+    """Request rejected as invalid (400), e.g. an unsupported query option."""
+    pass
+
+
 class MaxRetriesExceeded(TeamsExportError):
     """Maximum retry attempts exceeded."""
     pass
@@ -119,29 +201,19 @@ def parse_date(date_str: str) -> datetime:
     Raises:
         ValueError: If date string is invalid
     """
-    # Try ISO 8601 with timezone
-    for fmt in [
-        "%Y-%m-%dT%H:%M:%SZ",
-        "%Y-%m-%dT%H:%M:%S",
-        "%Y-%m-%d"
-    ]:
-        try:
-            dt = datetime.strptime(date_str, fmt)
-            # Ensure UTC timezone
-            if dt.tzinfo is None:
-                dt = dt.replace(tzinfo=timezone.utc)
-            return dt
-        except ValueError:
-            continue
-    
-    # Try parsing as ISO 8601 with timezone offset
+    # fromisoformat (C-implemented) covers all accepted forms; "Z" is
+    # spelled out as an offset for Pythons before 3.11
+    iso_str = date_str[:-1] + "+00:00" if date_str.endswith("Z") else date_str
     try:
-        dt = datetime.fromisoformat(date_str)
-        # Convert to UTC
-        return dt.astimezone(timezone.utc)
+        dt = datetime.fromisoformat(iso_str)
     except ValueError:
         pass
-    
+    else:
+        # Naive times are taken as UTC; offsets are converted to UTC
+        if dt.tzinfo is None:
+            return dt.replace(tzinfo=timezone.utc)
+        return dt.astimezone(timezone.utc)
+
     raise ValueError(
         f"Invalid date format: {date_str}. "
         f"Expected YYYY-MM-DD, YYYY-MM-DDTHH:MM:SS, or ISO 8601 format."
@@ -150,6 +222,8 @@ def parse_date(date_str: str) -> datetime:
 
 def load_token_cache() -> msal.SerializableTokenCache:
     """Load token cache from file."""
+    import msal
+
     cache = msal.SerializableTokenCache()
     if os.path.exists(TOKEN_CACHE_FILE):
         with open(TOKEN_CACHE_FILE, 'r') as f:
@@ -157,25 +231,104 @@ def load_token_cache() -> msal.SerializableTokenCache:
     return cache
 
 
+def _write_private_file(path: str, text: str) -> None:
+    """
+    Replace ``path`` atomically with ``text``, readable by the owner only.
+
+    The data is written and fsynced to a temporary sibling that is then
+    renamed over ``path``, so a crash never leaves a truncated file behind.
+    """
+    # Unique per thread, since the API server may save from several
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
 def save_token_cache(cache: msal.SerializableTokenCache) -> None:
-    """Save token cache to file."""
+    """Save token cache to file if it changed since the last save."""
     if cache.has_state_changed:
-        with open(TOKEN_CACHE_FILE, 'w') as f:
-            f.write(cache.serialize())
+        # A half-written cache would force a new device-code login
+        _write_private_file(TOKEN_CACHE_FILE, cache.serialize())
+        # Reset so a long-lived cache is only rewritten after the next change
+        cache.has_state_changed = False
 
 
 def clear_token_cache() -> None:
-    """Clear the token cache file."""
+    """Clear the token cache file (and the cached profile that goes with it)."""
     if os.path.exists(TOKEN_CACHE_FILE):
         os.remove(TOKEN_CACHE_FILE)
+    if os.path.exists(PROFILE_CACHE_FILE):
+        os.remove(PROFILE_CACHE_FILE)
+
+
+def _read_profile_cache() -> Dict[str, Any]:
+    try:
+        with open(PROFILE_CACHE_FILE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
 
+def load_cached_profile(tenant_id: str, client_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Return the signed-in user's profile cached by ``authenticate``.
+
+    Args:
+        tenant_id: Azure AD tenant ID
+        client_id: Application (client) ID
 
-def validate_token(access_token: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    Returns:
+        Profile dict, or None if nothing is cached or it is older than
+        ``PROFILE_CACHE_TTL``
+    """
+    entry = _read_profile_cache().get(f"{tenant_id}:{client_id}")
+    if entry and time.time() - entry.get("cached_at", 0) < PROFILE_CACHE_TTL:
+        return entry.get("profile")
+    return None
+
+
+def save_cached_profile(tenant_id: str, client_id: str, profile: Dict[str, Any]) -> None:
+    """Cache the signed-in user's profile for ``load_cached_profile`` (best effort)."""
+    data = _read_profile_cache()
+    data[f"{tenant_id}:{client_id}"] = {"cached_at": time.time(), "profile": profile}
+    try:
+        _write_private_file(PROFILE_CACHE_FILE, json.dumps(data))
+    except OSError:
+        pass
+
+
+def forget_cached_profile(tenant_id: str, client_id: str) -> None:
+    """Drop the cached profile for this app, e.g. after signing in afresh (best effort)."""
+    data = _read_profile_cache()
+    if data.pop(f"{tenant_id}:{client_id}", None) is not None:
+        try:
+            _write_private_file(PROFILE_CACHE_FILE, json.dumps(data))
+        except OSError:
+            pass
+
+
+def validate_token(
+    access_token: str,
+    session: Optional[requests.Session] = None,
+) -> Tuple[bool, Optional[Dict[str, Any]]]:
     """
     Validate access token by making a lightweight API call.
 
     Args:
         access_token: OAuth access token to validate
+        session: Optional session to reuse pooled connections
 
     Returns:
         Tuple of (is_valid, user_info) where user_info contains id and displayName
@@ -185,20 +338,20 @@ def validate_token(access_token: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
             "Authorization": f"Bearer {access_token}",
             "Accept": "application/json"
         }
-        response = requests.get(
+        response = (session or requests).get(
             f"{GRAPH_API_BASE_URL}/me?$select=id,displayName,mail,userPrincipalName",
             headers=headers,
             timeout=30
         )
         if response.status_code == 200:
-            return True, response.json()
+            return True, _json_loads(response.content)
         elif response.status_code == 401:
             return False, None
         else:
             # Other errors might be temporary, assume token is valid
             return True, None
-    except requests.RequestException:
-        # Network errors - can't determine validity
+    except (requests.RequestException, ValueError):
+        # Network errors or an unreadable body - can't determine validity
         return True, None
 
 
@@ -219,6 +372,7 @@ def authenticate(tenant_id: str, client_id: str, verbose: bool = True, force_log
         AuthenticationError: If authentication fails
     """
     print_progress("Initializing authentication...", verbose)
+    import msal
 
     try:
         # Clear cache if force_login is requested
@@ -250,6 +404,7 @@ def authenticate(tenant_id: str, client_id: str, verbose: bool = True, force_log
                     if is_valid:
                         print_progress("Authentication successful (cached token)", verbose)
                         if user_info:
+                            save_cached_profile(tenant_id, client_id, user_info)
                             display_name = user_info.get("displayName", "Unknown")
                             email = user_info.get("mail") or user_info.get("userPrincipalName", "Unknown")
                             print_progress(f"Authenticated as: {display_name} ({email})", verbose)
@@ -282,6 +437,9 @@ def authenticate(tenant_id: str, client_id: str, verbose: bool = True, force_log
             raise AuthenticationError(f"Authentication failed: {error_desc}")
 
         print_progress("Authentication successful", verbose)
+        # The device code may have been redeemed by a different account
+        # than the one whose profile is cached
+        forget_cached_profile(tenant_id, client_id)
         save_token_cache(cache)
         return result["access_token"]
 
@@ -291,10 +449,162 @@ def authenticate(tenant_id: str, client_id: str, verbose: bool = True, force_log
         raise AuthenticationError(f"Authentication error: {str(e)}")
 
 
+def prefetched_iter(iterable, ahead: int = 128) -> Iterator[Any]:
+    """
+    Iterate ``iterable`` on a background thread, buffering up to ``ahead`` items.
+
+    Wrapping ``GraphAPIClient._paginate`` this way lets the next page be
+    fetched while the caller is still processing the current one.  ``ahead``
+    should exceed the page size for whole-page fetches to overlap.
+    Exceptions from the producer are re-raised in the caller.
+
+    Args:
+        iterable: Source iterable (typically a pagination generator)
+        ahead: Maximum number of items buffered ahead of the consumer
+
+    Yields:
+        Items from ``iterable``, in order
+    """
+    buffer: queue.Queue = queue.Queue(maxsize=ahead)
+    stop = threading.Event()
+
+    def put(entry: Tuple[str, Any]) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for item in iterable:
+                if not put(("item", item)):
+                    return
+        except BaseException as e:
+            put(("error", e))
+        else:
+            put(("done", None))
+
+    worker = threading.Thread(target=produce, daemon=True)
+    worker.start()
+    try:
+        while True:
+            kind, value = buffer.get()
+            if kind == "item":
+                yield value
+            elif kind == "error":
+                raise value
+            else:
+                return
+    finally:
+        # Unblocks the producer if the consumer stops early
+        stop.set()
+
+
+class UserCache:
+    """
+    On-disk ``identifier -> user`` store for ``get_users_by_identifiers``.
+
+    Lets repeat exports with the same ``--participants`` skip the Graph user
+    search.  Entries are scoped to one tenant and expire after ``ttl``
+    seconds, so renamed or removed accounts are picked up again.
+    """
+
+    def __init__(self, path: str, tenant_id: str, ttl: float = USER_CACHE_TTL):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, isolation_level=None)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS users "
+            "(tenant_id TEXT NOT NULL, identifier TEXT NOT NULL, user_json TEXT NOT NULL, "
+            "cached_at REAL NOT NULL, PRIMARY KEY (tenant_id, identifier))"
+        )
+        self._tenant_id = tenant_id
+        self._ttl = ttl
+
+    def get(self, identifier: str) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute(
+            "SELECT user_json, cached_at FROM users WHERE tenant_id = ? AND identifier = ?",
+            (self._tenant_id, identifier.lower()),
+        ).fetchone()
+        if row is None or time.time() - row[1] >= self._ttl:
+            return None
+        return _json_loads(row[0])
+
+    def put(self, identifier: str, user: Dict[str, Any]) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO users (tenant_id, identifier, user_json, cached_at) "
+            "VALUES (?, ?, ?, ?)",
+            (self._tenant_id, identifier.lower(), json.dumps(user), time.time()),
+        )
+
+
+class AdaptiveThrottle:
+    """
+    Client-wide request pacing that adapts to Graph throttling.
+
+    Requests are not paced until Graph answers 429/503/504.  Then every
+    thread sharing the client waits out the backoff, and requests are
+    spaced to a rate that halves on each further throttle and grows by
+    ``step`` per success; once it is back at ``max_rate`` pacing stops.
+    This keeps concurrent workers from spending their retries on
+    requests that would be throttled too.
+    """
+
+    def __init__(
+        self,
+        max_rate: float = THROTTLE_MAX_RATE,
+        min_rate: float = THROTTLE_MIN_RATE,
+        step: float = THROTTLE_RATE_STEP,
+    ):
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.step = step
+        self.rate: Optional[float] = None  # None while unpaced
+        self._paused_until = 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Wait until the next request may be sent."""
+        if self.rate is None and time.monotonic() >= self._paused_until:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._paused_until)
+            if self.rate is not None:
+                start = max(start, self._next_slot)
+                self._next_slot = start + 1 / self.rate
+        if start > now:
+            time.sleep(start - now)
+
+    def on_success(self) -> None:
+        """Raise the allowed rate after a successful request."""
+        if self.rate is None:
+            return
+        with self._lock:
+            if self.rate is not None:
+                self.rate += self.step
+                if self.rate >= self.max_rate:
+                    self.rate = None
+
+    def on_throttled(self, delay: float) -> None:
+        """Pause all requests for ``delay`` seconds and halve the rate."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            self._next_slot = self._paused_until
+            self.rate = max(self.min_rate, (self.rate or self.max_rate) / 2)
+
+
 class GraphAPIClient:
     """Microsoft Graph API client with pagination and retry logic."""
 
-    def __init__(self, access_token: str, verbose: bool = True):
+    def __init__(
+        self,
+        access_token: str,
+        verbose: bool = True,
+    ):
         """
         Initialize Graph API client.
 
@@ -308,9 +618,43 @@ class GraphAPIClient:
             "Content-Type": "application/json"
         }
         self.session = requests.Session()
+        # The session's default Accept-Encoding is left alone: it already
+        # offers gzip/deflate, and adds br when the brotli package is
+        # installed (the only case where br responses can be decoded)
         self.session.headers.update(self.headers)
+        # Keep enough pooled keep-alive connections for all concurrent
+        # requests (member fetches, batches, prefetched pages), so none are
+        # opened and thrown away per request.  Mounted on https:// so any
+        # Graph host or API version in a nextLink shares the same pool.
+        self.session.mount(
+            "https://",
+            HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_SIZE, max_retries=0),
+        )
         self.max_retries = MAX_RETRIES
         self.verbose = verbose
+        # Shared by every thread using this client
+        self._throttle = AdaptiveThrottle()
+        self._chat_id_cache: Dict[str, str] = {}  # raw chat ID -> encoded
+        self._chat_cache: Dict[str, Dict[str, Any]] = {}  # raw chat ID -> chat
+        self._profile: Optional[Dict[str, Any]] = None
+        # chat_id -> members, least recently used first; shared by the
+        # batch and per-chat paths, which may run on worker threads
+        self._members_cache: OrderedDict[str, List[Dict[str, Any]]] = OrderedDict()
+        self._members_lock = threading.Lock()
+
+    def _cached_members(self, chat_id: str) -> Optional[List[Dict[str, Any]]]:
+        with self._members_lock:
+            members = self._members_cache.get(chat_id)
+            if members is not None:
+                self._members_cache.move_to_end(chat_id)
+            return members
+
+    def _remember_members(self, chat_id: str, members: List[Dict[str, Any]]) -> None:
+        with self._members_lock:
+            self._members_cache[chat_id] = members
+            self._members_cache.move_to_end(chat_id)
+            if len(self._members_cache) > MEMBERS_CACHE_SIZE:
+                self._members_cache.popitem(last=False)
 
     def _normalize_chat_id(self, chat_id: str) -> str:
         """
@@ -325,29 +669,42 @@ class GraphAPIClient:
         Returns:
             Properly URL-encoded chat ID
         """
+        # The same chat ID is encoded for its chat, members and messages
+        # requests; the note below is printed once per ID too
+        encoded = self._chat_id_cache.get(chat_id)
+        if encoded is not None:
+            return encoded
+
         # Check if the chat ID appears to be already URL-encoded
         # by looking for percent-encoded characters
-        if '%' in chat_id:
+        raw_chat_id = chat_id
+        if _PCT_RE.search(chat_id):
             # Decode it first
-            decoded = unquote(chat_id)
-            if decoded != chat_id:
-                print_progress(
-                    f"Note: Chat ID was URL-encoded. Using decoded value for proper encoding.\n"
-                    f"      In future, provide the unencoded chat ID from the Teams URL.",
-                    self.verbose
-                )
-                chat_id = decoded
+            chat_id = unquote(chat_id)
+            print_progress(
+                f"Note: Chat ID was URL-encoded. Using decoded value for proper encoding.\n"
+                f"      In future, provide the unencoded chat ID from the Teams URL.",
+                self.verbose
+            )
 
         # Now encode it properly for the API
-        return quote(chat_id, safe='')
+        encoded = quote(chat_id, safe='')
+        self._chat_id_cache[raw_chat_id] = encoded
+        return encoded
 
-    def _make_request(self, url: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    def _make_request(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        json_body: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
         """
         Make HTTP request with retry logic and rate limiting.
 
         Args:
             url: Full URL or path relative to base_url
             params: Query parameters
+            json_body: If given, the request is a POST with this JSON body
 
         Returns:
             JSON response as dictionary
@@ -363,13 +720,20 @@ class GraphAPIClient:
 
         for attempt in range(self.max_retries):
             try:
-                response = self.session.get(url, params=params, timeout=30)
+                self._throttle.acquire()
+                if json_body is None:
+                    response = self.session.get(url, params=params, timeout=30)
+                else:
+                    response = self.session.post(url, params=params, json=json_body, timeout=30)
 
                 if response.status_code == 200:
-                    return response.json()
+                    self._throttle.on_success()
+                    return _json_loads(response.content)
 
                 elif response.status_code in [429, 503, 504]:
-                    # Rate limited or service unavailable
+                    # Rate limited or service unavailable.  Retry-After is a
+                    # floor; the pause applies to every thread on this client
+                    # and is waited out by acquire() before the retry.
                     retry_after = int(response.headers.get("Retry-After", 0))
                     backoff = max(retry_after, DEFAULT_BACKOFF_BASE ** attempt)
                     jitter = random.uniform(0, 1)
@@ -380,21 +744,34 @@ class GraphAPIClient:
                         f"Retrying in {sleep_time:.1f}s... (attempt {attempt + 1}/{self.max_retries})",
                         self.verbose
                     )
-                    time.sleep(sleep_time)
+                    self._throttle.on_throttled(sleep_time)
                     continue
 
                 elif response.status_code == 403:
-                    error_data = response.json() if response.content else {}
+                    error_data = {}
+                    try:
+                        error_data = _json_loads(response.content) if response.content else {}
+                    except ValueError:
+                        pass
                     error_msg = error_data.get("error", {}).get("message", "Insufficient permissions")
                     raise PermissionError(
                         f"Access denied: {error_msg}. "
                         f"Ensure the app has Chat.Read and User.ReadBasic.All permissions."
                     )
 
+                elif response.status_code == 400:
+                    # Not transient, so not worth retrying
+                    error_details = ""
+                    try:
+                        error_details = _json_loads(response.content).get("error", {}).get("message", "")
+                    except ValueError:
+                        pass
+                    raise BadRequestError(f"Bad request: {url} {error_details}".rstrip())
+
                 elif response.status_code == 404:
                     error_details = ""
                     try:
-                        error_json = response.json()
+                        error_json = _json_loads(response.content)
                         error_details = f"\nAPI Error: {error_json.get('error', {}).get('message', 'No details')}"
                     except:
                         pass
@@ -455,30 +832,75 @@ class GraphAPIClient:
                         self.verbose,
                     )
 
-            for item in items:
-                yield item
+            yield from items
 
             # Get next page URL
             current_url = response.get("@odata.nextLink")
             current_params = None  # nextLink contains full URL with params
 
-    def get_my_chats(self, filter_query: Optional[str] = None) -> List[Dict[str, Any]]:
+    def _paginate_with_filter(
+        self,
+        url: str,
+        params: Dict[str, Any],
+        filter_query: Optional[str],
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Paginate with a server-side ``$filter``, dropping it if Graph rejects it.
+
+        The filter only narrows what is transferred; callers must still apply
+        the same criteria client-side, since the fallback returns everything.
+
+        Args:
+            url: Initial URL
+            params: Query parameters, without ``$filter``
+            filter_query: OData ``$filter`` expression, or None
+
+        Yields:
+            Individual items from paginated response
+        """
+        if not filter_query:
+            yield from self._paginate(url, params)
+            return
+        yielded = False
+        try:
+            for item in self._paginate(url, {**params, "$filter": filter_query}):
+                yielded = True
+                yield item
+        except BadRequestError:
+            if yielded:
+                raise
+            print_progress("Server-side filter not supported; filtering locally", self.verbose)
+            yield from self._paginate(url, params)
+
+    def get_my_chats(
+        self,
+        filter_query: Optional[str] = None,
+        expand_members: bool = False,
+    ) -> List[Dict[str, Any]]:
         """
         Get all chats for the authenticated user.
 
         Args:
             filter_query: OData $filter query string
+            expand_members: Request members inline (``$expand=members``);
+                Graph still omits them for some chats, e.g. meetings
 
         Returns:
             List of chat objects
         """
         print_progress("Retrieving chats...", self.verbose)
 
-        params = {}
+        # Only the fields the exporter reads
+        params = {"$select": CHAT_SELECT_FIELDS}
         if filter_query:
             params["$filter"] = filter_query
+        if expand_members:
+            params["$expand"] = "members"
 
         chats = list(self._paginate("/me/chats", params))
+        for chat in chats:
+            if chat.get("members") is not None:
+                chat["members"] = _slim_members(chat["members"])
         print_progress(f"Retrieved {len(chats)} chats", self.verbose)
         return chats
 
@@ -486,32 +908,159 @@ class GraphAPIClient:
         """
         Get specific chat by ID.
 
+        Results are memoized per client; each call returns a fresh copy, so
+        callers may add keys (e.g. ``members``) without affecting the cache.
+
         Args:
             chat_id: Chat ID
 
         Returns:
             Chat object
         """
-        print_progress(f"Retrieving chat {chat_id}...", self.verbose)
-        # Normalize and URL-encode the chat ID
-        encoded_chat_id = self._normalize_chat_id(chat_id)
-        return self._make_request(f"/chats/{encoded_chat_id}")
+        chat = self._chat_cache.get(chat_id)
+        if chat is None:
+            print_progress(f"Retrieving chat {chat_id}...", self.verbose)
+            # Normalize and URL-encode the chat ID
+            encoded_chat_id = self._normalize_chat_id(chat_id)
+            chat = self._make_request(f"/chats/{encoded_chat_id}")
+            self._chat_cache[chat_id] = chat
+        return dict(chat)
 
     def get_chat_members(self, chat_id: str) -> List[Dict[str, Any]]:
         """
         Get members of a chat.
 
+        Results are memoized per client, so asking again for the same chat
+        (e.g. on a retry path) does not repeat the request.
+
         Args:
             chat_id: Chat ID
 
         Returns:
-            List of member objects
+            List of member objects, reduced to ``userId``, ``displayName``
+            and ``email``
         """
+        members = self._cached_members(chat_id)
+        if members is not None:
+            return members
         # Normalize and URL-encode the chat ID
         encoded_chat_id = self._normalize_chat_id(chat_id)
-        members = list(self._paginate(f"/chats/{encoded_chat_id}/members"))
+        members = _slim_members(self._paginate(f"/chats/{encoded_chat_id}/members"))
+        self._remember_members(chat_id, members)
         return members
 
+    def get_chat_members_batch(self, chat_ids: List[str]) -> Dict[str, Any]:
+        """
+        Get members of several chats using Graph JSON batching.
+
+        Up to ``BATCH_MAX_REQUESTS`` member lookups are sent per ``$batch``
+        POST instead of one GET per chat.  Sub-requests that were throttled
+        or failed transiently (or a whole batch that failed) are retried
+        individually via ``get_chat_members``, concurrently.
+
+        Args:
+            chat_ids: Chat IDs
+
+        Returns:
+            Dict mapping each chat ID to its list of members, or to the
+            exception ``get_chat_members`` would have raised for it
+        """
+        results: Dict[str, Any] = {}
+        uncached = []
+        for chat_id in chat_ids:
+            members = self._cached_members(chat_id)
+            if members is not None:
+                results[chat_id] = members
+            else:
+                uncached.append(chat_id)
+        chat_ids = uncached
+
+        for start in range(0, len(chat_ids), BATCH_MAX_REQUESTS):
+            chunk = chat_ids[start:start + BATCH_MAX_REQUESTS]
+            body = {
+                "requests": [
+                    {
+                        "id": str(i),
+                        "method": "GET",
+                        "url": f"/chats/{self._normalize_chat_id(chat_id)}/members",
+                    }
+                    for i, chat_id in enumerate(chunk)
+                ]
+            }
+            try:
+                response = self._make_request("/$batch", json_body=body)
+            except TeamsExportError as e:
+                print_progress(f"Batch request failed ({e}); fetching members per chat", self.verbose)
+                response = {}
+
+            retry_after = 0
+            for sub in response.get("responses", []):
+                chat_id = chunk[int(sub["id"])]
+                status = sub.get("status")
+                if status == 429:
+                    headers = sub.get("headers") or {}
+                    retry_after = max(retry_after, int(headers.get("Retry-After", 0)))
+                    continue
+                sub_body = sub.get("body") or {}
+                error_msg = (sub_body.get("error") or {}).get("message", "No details")
+                if status == 200:
+                    members = _slim_members(sub_body.get("value", []))
+                    next_link = sub_body.get("@odata.nextLink")
+                    if next_link:
+                        members.extend(_slim_members(self._paginate(next_link)))
+                    results[chat_id] = members
+                    self._remember_members(chat_id, members)
+                elif status == 403:
+                    results[chat_id] = PermissionError(
+                        f"Access denied: {error_msg}. "
+                        f"Ensure the app has Chat.Read and User.ReadBasic.All permissions."
+                    )
+                elif status == 404:
+                    results[chat_id] = NotFoundError(
+                        f"Resource not found: /chats/{chat_id}/members\nAPI Error: {error_msg}"
+                    )
+
+            # Throttled, failed or missing sub-requests: retry one by one,
+            # after waiting as long as Graph asked for throttled ones
+            retry_ids = [chat_id for chat_id in chunk if chat_id not in results]
+            if retry_ids:
+                if retry_after:
+                    print_progress(
+                        f"Member batch throttled. Retrying in {retry_after}s...",
+                        self.verbose
+                    )
+                    time.sleep(retry_after)
+                    self._throttle.on_throttled(0)
+                results.update(self._get_chat_members_concurrently(retry_ids))
+        return results
+
+    def _get_chat_members_concurrently(self, chat_ids: List[str]) -> Dict[str, Any]:
+        """
+        Get members of several chats with parallel ``get_chat_members`` calls.
+
+        The requests are I/O-bound, so a small thread pool overlaps their
+        round-trips.  ``_make_request`` honours ``Retry-After`` inside each
+        worker when Graph throttles.
+
+        Args:
+            chat_ids: Chat IDs
+
+        Returns:
+            Dict mapping each chat ID to its list of members, or to the
+            exception raised while fetching them
+        """
+        def fetch(chat_id: str) -> Any:
+            try:
+                return self.get_chat_members(chat_id)
+            except Exception as e:
+                return e
+
+        if len(chat_ids) == 1:
+            return {chat_ids[0]: fetch(chat_ids[0])}
+        workers = min(MEMBER_FETCH_WORKERS, len(chat_ids))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return dict(zip(chat_ids, pool.map(fetch, chat_ids)))
+
     def get_chat_messages(
         self,
         chat_id: str,
@@ -564,10 +1113,10 @@ class GraphAPIClient:
         # Check if query looks like an email
         if "@" in query:
             # Search by userPrincipalName
-            filter_query = f"userPrincipalName eq '{query}'"
+            filter_query = f"userPrincipalName eq {_odata_string(query)}"
         else:
             # Search by display name (startswith for better performance)
-            filter_query = f"startswith(displayName, '{query}')"
+            filter_query = f"startswith(displayName, {_odata_string(query)})"
 
         params = {
             "$filter": filter_query,
@@ -577,14 +1126,130 @@ class GraphAPIClient:
         users = list(self._paginate("/users", params))
         return users
 
+    def search_users_bulk(self, identifiers: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Search for several users with one ``/users`` request per 15 identifiers.
+
+        Emails are matched with ``userPrincipalName in (...)`` and names with
+        ``startswith(displayName, ...)``, all OR-ed into one ``$filter``, so
+        each identifier gets the same candidates ``search_users`` would return.
+
+        Args:
+            identifiers: Display names and/or emails
+
+        Returns:
+            Dict mapping each identifier to its list of matching users
+        """
+        results: Dict[str, List[Dict[str, Any]]] = {identifier: [] for identifier in identifiers}
+        unique = list(results)
+        for start in range(0, len(unique), USER_FILTER_MAX_TERMS):
+            chunk = unique[start:start + USER_FILTER_MAX_TERMS]
+            emails = [i for i in chunk if "@" in i]
+            names = [i for i in chunk if "@" not in i]
+            terms = [f"startswith(displayName, {_odata_string(name)})" for name in names]
+            if emails:
+                terms.insert(0, f"userPrincipalName in ({', '.join(map(_odata_string, emails))})")
+            params = {
+                "$filter": " or ".join(terms),
+                "$select": "id,displayName,userPrincipalName"
+            }
+
+            for user in self._paginate("/users", params):
+                upn = (user.get("userPrincipalName") or "").lower()
+                display_name = (user.get("displayName") or "").lower()
+                for email in emails:
+                    if upn == email.lower():
+                        results[email].append(user)
+                for name in names:
+                    if display_name.startswith(name.lower()):
+                        results[name].append(user)
+        return results
+
     def get_my_profile(self) -> Dict[str, Any]:
         """
-        Get authenticated user's profile.
+        Get authenticated user's profile (memoized per client).
 
         Returns:
             User profile object
         """
-        return self._make_request("/me")
+        if self._profile is None:
+            self._profile = self._make_request("/me")
+        return self._profile
+
+
+def iter_chats_with_members(
+    client: GraphAPIClient,
+    chats: Iterable[Dict[str, Any]],
+    batch_size: int = BATCH_MAX_REQUESTS,
+    max_in_flight: int = BATCHES_IN_FLIGHT,
+    fetch_members: Optional[Callable[[Dict[str, Any]], bool]] = None,
+) -> Iterator[Tuple[Dict[str, Any], Optional[List[Dict[str, Any]]], Optional[Exception]]]:
+    """
+    Pair each chat with its members, fetched in ``$batch`` groups.
+
+    Chats listed with ``$expand=members`` already carry their members and
+    are used as-is.  The rest (Graph omits members for some chats, e.g.
+    meetings) are buffered ``batch_size`` at a time so their members can be
+    retrieved with one batch request.  Up to ``max_in_flight`` batches run
+    on background threads while further chats are read and earlier results
+    are consumed.  Order is preserved.
+
+    Chats without inline members for which ``fetch_members`` returns False
+    are yielded with ``members`` and ``error`` both None, without a request.
+
+    Args:
+        client: Graph API client
+        chats: Chat objects (e.g. from ``client._paginate("/me/chats")``)
+        batch_size: Chats per batch request
+        max_in_flight: Batch requests allowed to run concurrently
+        fetch_members: Optional predicate deciding whether a chat's members
+            are worth fetching (default: always)
+
+    Yields:
+        ``(chat, members, error)`` tuples; ``members`` is None and ``error``
+        holds the exception when the members could not be retrieved
+    """
+    buffer: List[Tuple[Dict[str, Any], bool]] = []  # (chat, needs fetching)
+    in_flight: deque = deque()  # (group, future) in input order
+
+    def submit(pool: ThreadPoolExecutor) -> None:
+        chat_ids = [chat.get('id', 'N/A') for chat, fetch in buffer if fetch]
+        in_flight.append((list(buffer), pool.submit(client.get_chat_members_batch, chat_ids)))
+        buffer.clear()
+
+    def drain_oldest() -> Iterator[Tuple[Dict[str, Any], Optional[List[Dict[str, Any]]], Optional[Exception]]]:
+        group, future = in_flight.popleft()
+        results = future.result()
+        for chat, fetch in group:
+            result = results.get(chat.get('id', 'N/A')) if fetch else chat.get('members')
+            if isinstance(result, Exception):
+                yield chat, None, result
+            else:
+                yield chat, result, None
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        pending = 0
+        for chat in chats:
+            fetch = chat.get('members') is None and (fetch_members is None or fetch_members(chat))
+            if not buffer and not in_flight and not fetch:
+                yield chat, chat.get('members'), None
+                continue
+            buffer.append((chat, fetch))
+            if fetch:
+                pending += 1
+            # Cap the buffer too, so a run of expanded chats behind one pending
+            # chat is not held back indefinitely
+            if pending >= batch_size or len(buffer) >= 5 * batch_size:
+                submit(pool)
+                pending = 0
+            # Hand back whatever has finished, and block only when the
+            # pipeline is full
+            while in_flight and (in_flight[0][1].done() or len(in_flight) >= max_in_flight):
+                yield from drain_oldest()
+        if buffer:
+            submit(pool)
+        while in_flight:
+            yield from drain_oldest()
 
 
 def html_to_text(html: str) -> str:
@@ -599,6 +1264,16 @@ def html_to_text(html: str) -> str:
     """
     if not html:
         return ""
+    return _html_to_text_cached(html)
+
+
+# Chats repeat identical bodies (system events, meeting cards, quoted
+# replies), so recent conversions are reused instead of re-parsed
+@lru_cache(maxsize=HTML_CACHE_SIZE)
+def _html_to_text_cached(html: str) -> str:
+    # Imported here: html2text/bs4 add noticeable startup time and are only
+    # needed once there is a message body to convert
+    import html2text
 
     try:
         # Use html2text for conversion
@@ -612,6 +1287,8 @@ def html_to_text(html: str) -> str:
     except Exception:
         # Fallback to BeautifulSoup
         try:
+            from bs4 import BeautifulSoup
+
             soup = BeautifulSoup(html, "lxml")
             return soup.get_text(separator="\n", strip=True)
         except Exception:
@@ -619,6 +1296,11 @@ def html_to_text(html: str) -> str:
             return html
 
 
+def _odata_string(value: str) -> str:
+    """Quote a value as an OData string literal."""
+    return "'" + value.replace("'", "''") + "'"
+
+
 def get_user_by_identifier(
     client: GraphAPIClient,
     identifier: str
@@ -639,26 +1321,72 @@ def get_user_by_identifier(
     """
     print_progress(f"Resolving user: {identifier}", client.verbose)
 
-    users = client.search_users(identifier)
+    return _pick_user(identifier, client.search_users(identifier))
 
+
+def get_users_by_identifiers(
+    client: GraphAPIClient,
+    identifiers: List[str],
+    cache: Optional[UserCache] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Resolve several display names or emails with batched user searches.
+
+    Args:
+        client: Graph API client
+        identifiers: Display names or emails (UPNs)
+        cache: Optional cache of earlier resolutions; only identifiers it
+            does not hold are searched, and new resolutions are stored
+
+    Returns:
+        User objects, in the order of ``identifiers``
+
+    Raises:
+        NotFoundError: If a user is not found
+        TeamsExportError: If an identifier matches multiple users
+    """
+    print_progress(f"Resolving users: {', '.join(identifiers)}", client.verbose)
+
+    resolved = {}
+    if cache is not None:
+        for identifier in identifiers:
+            user = cache.get(identifier)
+            if user is not None:
+                resolved[identifier] = user
+
+    missing = [identifier for identifier in identifiers if identifier not in resolved]
+    if missing:
+        candidates = client.search_users_bulk(missing)
+        for identifier in missing:
+            resolved[identifier] = _pick_user(identifier, candidates[identifier])
+            if cache is not None:
+                cache.put(identifier, resolved[identifier])
+
+    return [resolved[identifier] for identifier in identifiers]
+
+
+def _pick_user(identifier: str, users: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Pick the user an identifier refers to from its search results.
+
+    Raises:
+        NotFoundError: If there are no results
+        TeamsExportError: If the results stay ambiguous after exact matching
+    """
     if not users:
         raise NotFoundError(f"User not found: {identifier}")
 
     # If multiple matches, try exact match
     if len(users) > 1:
+        needle = identifier.lower()
+
         # Try exact match on display name
-        exact_matches = [
-            u for u in users
-            if u.get("displayName", "").lower() == identifier.lower()
-        ]
+        exact_matches = [u for u in users if (u.get("displayName") or "").lower() == needle]
         if len(exact_matches) == 1:
             return exact_matches[0]
 
         # Try exact match on UPN
-        exact_matches = [
-            u for u in users
-            if u.get("userPrincipalName", "").lower() == identifier.lower()
-        ]
+        exact_matches = [u for u in users if (u.get("userPrincipalName") or "").lower() == needle]
         if len(exact_matches) == 1:
             return exact_matches[0]
 
@@ -677,7 +1405,7 @@ def get_user_by_identifier(
 
 def find_chats_by_participants(
     client: GraphAPIClient,
-    participant_ids: List[str]
+    participant_ids: List[str],
 ) -> List[Dict[str, Any]]:
     """
     Find chats where all specified participants are members.
@@ -694,28 +1422,44 @@ def find_chats_by_participants(
         client.verbose
     )
 
-    # Get all chats
-    all_chats = client.get_my_chats()
+    # Get all chats, with their members inline where Graph provides them
+    all_chats = client.get_my_chats(expand_members=True)
 
     matching_chats = []
     participant_set = set(participant_ids)
 
-    for chat in all_chats:
-        chat_id = chat["id"]
+    # A 1:1 chat has exactly two members, so it cannot contain more than two
+    # requested participants; skip those without fetching their members
+    if len(participant_set) > 2:
+        all_chats = [chat for chat in all_chats if chat.get("chatType") != "oneOnOne"]
 
-        # Get chat members
-        members = client.get_chat_members(chat_id)
+    # Chats listed without members have them fetched in $batch groups of
+    # up to 20, instead of one request per chat
+    for chat, members, error in iter_chats_with_members(client, all_chats):
+        if error is not None:
+            raise error
         member_ids = {m.get("userId") for m in members if m.get("userId")}
 
-        # Check if all participants are in this chat
+        # Check if all participants are in this chat; the caller's chat
+        # dicts are left untouched
         if participant_set.issubset(member_ids):
-            chat["members"] = members
-            matching_chats.append(chat)
+            matching_chats.append({**chat, "members": members})
 
     print_progress(f"Found {len(matching_chats)} matching chats", client.verbose)
     return matching_chats
 
 
+def _utc_second_key(dt: datetime) -> Optional[str]:
+    """
+    Return ``dt`` as a ``YYYY-MM-DDTHH:MM:SS`` UTC string for comparing
+    against Graph timestamps, or None if it is naive or has sub-second
+    precision (where the string comparison would not be exact).
+    """
+    if dt.tzinfo is None or dt.microsecond:
+        return None
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+
+
 def get_chat_messages_filtered(
     client: GraphAPIClient,
     chat_id: str,
@@ -723,7 +1467,8 @@ def get_chat_messages_filtered(
     until: Optional[datetime] = None,
     only_mine: bool = False,
     my_user_id: Optional[str] = None,
-    exclude_system_messages: bool = False
+    exclude_system_messages: bool = False,
+    on_page: Optional[Callable[[int], None]] = None,
 ) -> Tuple[List[Dict[str, Any]], datetime]:
     """
     Retrieve messages for a chat with date filtering.
@@ -736,6 +1481,8 @@ def get_chat_messages_filtered(
         only_mine: Only include messages from authenticated user
         my_user_id: Authenticated user's ID (required if only_mine=True)
         exclude_system_messages: Exclude system event messages (member joins, renames, etc.)
+        on_page: Optional callback invoked for each page with the number
+            of messages returned in that page.
 
     Returns:
         Tuple of (filtered message list, actual until date used for filtering)
@@ -760,62 +1507,92 @@ def get_chat_messages_filtered(
     # Track and report pagination progress
     total_messages = 0
 
-    def on_page(page_count: int) -> None:
+    def report_page(page_count: int) -> None:
         nonlocal total_messages
         total_messages += page_count
         print_progress(
-            f"Retrieved {total_messages} messages so far...",
+            f"Chat {chat_id}: retrieved {total_messages} messages so far...",
             client.verbose,
         )
+        if on_page is not None:
+            on_page(page_count)
 
     # Get messages with server-side filter, required orderby, and page-level progress
     messages = client.get_chat_messages(
         chat_id,
         filter_query,
         orderby,
-        on_page=on_page,
+        on_page=report_page,
     )
 
     # Apply precise client-side filtering on createdDateTime
     filtered_messages = []
     max_message_dt = None  # Track the latest message date for auto-determining until
-    
+    max_created_key = ""  # Same, for timestamps compared as strings
+
+    # Graph timestamps are UTC ISO 8601 ("2025-06-01T10:00:00.123Z"), which
+    # sort lexicographically, so whole-second bounds can be compared against
+    # the first 19 characters without building a datetime per message
+    since_key = _utc_second_key(since)
+    until_key = _utc_second_key(until) if until is not None else ""
+    use_keys = since_key is not None and until_key is not None
+
     for msg in messages:
         created_str = msg.get("createdDateTime")
         if not created_str:
             continue
 
-        created_dt = datetime.fromisoformat(created_str.replace("Z", "+00:00"))
-
-        # Check date range: since inclusive, until exclusive (if specified)
-        if until is not None:
-            # Until specified: respect the boundary
-            if not (since <= created_dt < until):
+        if use_keys and len(created_str) >= 20 and created_str[10] == "T" and created_str[-1] == "Z":
+            created_key = created_str[:19]
+            # Since inclusive, until exclusive (if specified)
+            if created_key < since_key or (until_key and created_key >= until_key):
                 continue
+            if until is None and created_key > max_created_key:
+                max_created_key = created_key
         else:
-            # No until specified: include messages from since onwards
-            if created_dt < since:
-                continue
-            # Track the latest message date for auto-determining until
-            if max_message_dt is None or created_dt > max_message_dt:
-                max_message_dt = created_dt
+            created_dt = datetime.fromisoformat(created_str.replace("Z", "+00:00"))
+
+            # Check date range: since inclusive, until exclusive (if specified)
+            if until is not None:
+                # Until specified: respect the boundary
+                if not (since <= created_dt < until):
+                    continue
+            else:
+                # No until specified: include messages from since onwards
+                if created_dt < since:
+                    continue
+                # Track the latest message date for auto-determining until
+                if max_message_dt is None or created_dt > max_message_dt:
+                    max_message_dt = created_dt
 
         # Filter out system messages if requested
         if exclude_system_messages:
-            body = msg.get("body", {})
+            body = msg.get("body") or _EMPTY
             body_content = body.get("content", "")
             # System messages have body.content == "<systemEventMessage/>"
             if body_content == "<systemEventMessage/>":
                 continue
 
-        # Check author if only_mine is True
+        # Check author if only_mine is True (system messages have "from": null)
+        from_user = (msg.get("from") or _EMPTY).get("user") or _EMPTY
         if only_mine and my_user_id:
-            from_user = msg.get("from", {}).get("user", {})
             if from_user.get("id") != my_user_id:
                 continue
 
+        # The same few senders repeat across thousands of kept messages;
+        # interning keeps one copy of each id and name alive, not one per message
+        for key in ("id", "displayName"):
+            value = from_user.get(key)
+            if type(value) is str:
+                from_user[key] = sys.intern(value)
+
         filtered_messages.append(msg)
 
+    if max_created_key:
+        max_key_dt = datetime.fromisoformat(max_created_key).replace(tzinfo=timezone.utc)
+        if max_message_dt is None or max_key_dt > max_message_dt:
+            max_message_dt = max_key_dt
+
     # Sort by createdDateTime ascending
     filtered_messages.sort(key=lambda m: m.get("createdDateTime", ""))
 
@@ -832,7 +1609,7 @@ def get_chat_messages_filtered(
         actual_until = datetime.now(timezone.utc)
 
     print_progress(
-        f"Retrieved {len(filtered_messages)} messages in date range",
+        f"Chat {chat_id}: retrieved {len(filtered_messages)} messages in date range",
         client.verbose
     )
     return filtered_messages, actual_until
@@ -848,9 +1625,13 @@ def process_message(msg: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Processed message dictionary
     """
-    body = msg.get("body", {})
+    body = msg.get("body") or _EMPTY
     body_html = body.get("content", "")
-    body_text = html_to_text(body_html)
+    if body.get("contentType") == "text":
+        # Already plain text: skip the HTML conversion
+        body_text = body_html.strip()
+    else:
+        body_text = html_to_text(body_html)
 
     # Process attachments
     attachments = []
@@ -864,11 +1645,10 @@ def process_message(msg: Dict[str, Any]) -> Dict[str, Any]:
         attachments.append(attachment_info)
 
     # Extract sender info
-    from_info = msg.get("from", {})
-    user_info = from_info.get("user") if from_info else None
+    user_info = (msg.get("from") or _EMPTY).get("user")
     # Ensure user_info is a dict; handle None or missing user object
     if not isinstance(user_info, dict):
-        user_info = {}
+        user_info = _EMPTY
 
     return {
         "id": msg.get("id", ""),
@@ -888,29 +1668,100 @@ def export_to_json(data: Dict[str, Any], output_path: Optional[str] = None) -> N
     """
     Export data to JSON format.
 
+    An output path ending in ``.zst`` or ``.gz`` is written compressed.
+
     Args:
         data: Data to export
         output_path: Output file path (None for stdout)
     """
-    json_str = json.dumps(data, indent=2, ensure_ascii=False)
-
     if output_path:
         output_file = Path(output_path)
         output_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(json_str)
+        with _open_json_export(output_file) as f:
+            write_json_export(f, data, data.get("messages", []))
         print_progress(f"Exported to {output_path}", True)
     else:
-        print(json_str)
+        sys.stdout.flush()
+        write_json_export(sys.stdout.buffer, data, data.get("messages", []))
+        sys.stdout.buffer.write(b"\n")
+        sys.stdout.buffer.flush()
 
 
-def export_to_txt(data: Dict[str, Any], output_path: Optional[str] = None) -> None:
+def _open_json_export(path: Path) -> BinaryIO:
     """
-    Export data to human-readable text format.
+    Open a JSON export file for writing, compressed according to its suffix.
+
+    Raises:
+        TeamsExportError: If a ``.zst`` path is given without zstandard installed
+    """
+    if path.suffix == ".zst":
+        try:
+            import zstandard
+        except ImportError:
+            raise TeamsExportError("Writing .zst exports requires the zstandard package")
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(open(path, "wb"))
+    if path.suffix == ".gz":
+        return gzip.open(path, "wb", compresslevel=GZIP_LEVEL)
+    return open(path, "wb", buffering=EXPORT_BUFFER_SIZE)
+
+
+def write_json_export(f: BinaryIO, data: Dict[str, Any], messages: Iterable[Dict[str, Any]]) -> None:
+    """
+    Write the JSON export to an open binary file, one message at a time.
+
+    The output is the indented JSON of ``data`` with ``"messages"`` as its
+    last key, but ``messages`` may be any iterable (e.g. a generator of
+    processed messages) and is encoded item by item, so neither the
+    processed list nor the whole document is held in memory.
 
     Args:
-        data: Data to export
-        output_path: Output file path (None for stdout)
+        f: Binary file object to write to
+        data: Export metadata (a ``"messages"`` entry in it is ignored)
+        messages: Processed messages, in output order
+    """
+    head = {key: value for key, value in data.items() if key != "messages"}
+    head["messages"] = []
+    # Everything up to and including the opening '[' of the messages list
+    f.write(_json_dumps_pretty(head)[:-len(b"]\n}")])
+
+    separator = b"\n    "
+    for message in messages:
+        f.write(separator)
+        # Nested two levels deep; JSON strings never contain raw newlines
+        f.write(_json_dumps_pretty(message).replace(b"\n", b"\n    "))
+        separator = b",\n    "
+
+    f.write(b"]\n}" if separator == b"\n    " else b"\n  ]\n}")
+
+
+def _format_message_timestamp(created: str) -> str:
+    """
+    Format a Graph timestamp as ``YYYY-MM-DD HH:MM:SS UTC`` for the text export.
+
+    Graph's usual UTC form is reformatted by slicing the regex match; other
+    values are parsed, and returned unchanged if they cannot be.
+    """
+    try:
+        match = _GRAPH_UTC_RE.fullmatch(created)
+        if match:
+            return f"{match[1]} {match[2]} UTC"
+        dt = datetime.fromisoformat(created.replace("Z", "+00:00"))
+        return dt.strftime("%Y-%m-%d %H:%M:%S UTC")
+    except Exception:
+        return created
+
+
+def write_txt_export(f: TextIO, data: Dict[str, Any], messages: Iterable[Dict[str, Any]]) -> None:
+    """
+    Write the human-readable text export to an open file, one message at a time.
+
+    ``messages`` may be any iterable (e.g. a generator of processed
+    messages), so the full message list never has to be held as text.
+
+    Args:
+        f: Text file object to write to
+        data: Export metadata (chat, participants, date range, message count)
+        messages: Processed messages, in output order
     """
     lines = []
 
@@ -944,25 +1795,21 @@ def export_to_txt(data: Dict[str, Any], output_path: Optional[str] = None) -> No
     lines.append("MESSAGES")
     lines.append("=" * 80)
     lines.append("")
+    f.write("\n".join(lines))
 
-    messages = data.get("messages", [])
     for i, msg in enumerate(messages):
+        # Separator between messages
+        lines = ["", "-" * 80, ""] if i else []
+
         # Parse and format timestamp
-        created = msg.get("createdDateTime", "")
-        try:
-            dt = datetime.fromisoformat(created.replace("Z", "+00:00"))
-            timestamp = dt.strftime("%Y-%m-%d %H:%M:%S UTC")
-        except:
-            timestamp = created
+        timestamp = _format_message_timestamp(msg.get("createdDateTime", ""))
 
         # Message header
         from_name = msg.get("from", {}).get("displayName", "Unknown")
         lines.append(f"[{timestamp}] {from_name}:")
 
         # Message body
-        body_text = msg.get("body_text", "")
-        for line in body_text.split("\n"):
-            lines.append(line)
+        lines.append(msg.get("body_text", ""))
 
         # Attachments
         attachments = msg.get("attachments", [])
@@ -974,23 +1821,29 @@ def export_to_txt(data: Dict[str, Any], output_path: Optional[str] = None) -> No
             ])
             lines.append(f"[Attachments: {att_names}]")
 
-        # Separator between messages
-        if i < len(messages) - 1:
-            lines.append("")
-            lines.append("-" * 80)
-            lines.append("")
+        f.write("\n")
+        f.write("\n".join(lines))
+
 
-    # Write output
-    output_text = "\n".join(lines)
+def export_to_txt(data: Dict[str, Any], output_path: Optional[str] = None) -> None:
+    """
+    Export data to human-readable text format.
+
+    Args:
+        data: Data to export
+        output_path: Output file path (None for stdout)
+    """
+    messages = data.get("messages", [])
 
     if output_path:
         output_file = Path(output_path)
         output_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(output_text)
+        with open(output_file, 'w', encoding='utf-8', buffering=EXPORT_BUFFER_SIZE) as f:
+            write_txt_export(f, data, messages)
         print_progress(f"Exported to {output_path}", True)
     else:
-        print(output_text)
+        write_txt_export(sys.stdout, data, messages)
+        print()
 
 
 def main() -> int:
@@ -1095,7 +1948,9 @@ Examples:
     )
     parser.add_argument(
         "--output",
-        help="Output file path (default: stdout or ./output.{format})"
+        help="Output file path (default: stdout or ./output.{format}). "
+             "JSON paths ending in .gz or .zst are written compressed "
+             "(.zst needs the zstandard package)"
     )
     parser.add_argument(
         "--verbose",
@@ -1118,6 +1973,11 @@ Examples:
     if not args.client_id:
         print("Error: --client-id must be provided via CLI argument or TEAMS_CLIENT_ID environment variable", file=sys.stderr)
         return EXIT_ERROR
+    # Fail before any Graph work rather than when the first file is written
+    if args.format == "json" and args.output and args.output.endswith(".zst"):
+        if importlib.util.find_spec("zstandard") is None:
+            print("Error: writing .zst exports requires the zstandard package", file=sys.stderr)
+            return EXIT_ERROR
 
     try:
         # Parse dates
@@ -1150,8 +2010,12 @@ Examples:
         # Create Graph API client
         client = GraphAPIClient(access_token, args.verbose)
 
-        # Get authenticated user's profile
-        my_profile = client.get_my_profile()
+        # Get authenticated user's profile; authenticate() caches it when it
+        # validates a cached token, which makes this a file read on warm runs
+        my_profile = load_cached_profile(args.tenant_id, args.client_id)
+        if my_profile is None:
+            my_profile = client.get_my_profile()
+            save_cached_profile(args.tenant_id, args.client_id, my_profile)
         my_user_id = my_profile.get("id")
 
         print_progress(
@@ -1176,20 +2040,24 @@ Examples:
 
         else:
             # Export by participants
-            # Resolve participant identifiers to user IDs
-            participant_ids = []
-            for identifier in args.participants:
+            # Resolve participant identifiers to user IDs (one search for all)
+            try:
                 try:
-                    user = get_user_by_identifier(client, identifier)
-                    participant_ids.append(user["id"])
-                    print_progress(
-                        f"Resolved '{identifier}' to {user.get('displayName')} "
-                        f"({user.get('userPrincipalName')})",
-                        args.verbose
-                    )
-                except (NotFoundError, TeamsExportError) as e:
-                    print(f"Error: {e}", file=sys.stderr)
-                    return EXIT_ERROR
+                    user_cache = UserCache(USER_CACHE_PATH, args.tenant_id)
+                except (OSError, sqlite3.Error):
+                    user_cache = None  # Caching is best effort
+                users = get_users_by_identifiers(client, args.participants, user_cache)
+            except (NotFoundError, TeamsExportError) as e:
+                print(f"Error: {e}", file=sys.stderr)
+                return EXIT_ERROR
+            participant_ids = []
+            for identifier, user in zip(args.participants, users):
+                participant_ids.append(user["id"])
+                print_progress(
+                    f"Resolved '{identifier}' to {user.get('displayName')} "
+                    f"({user.get('userPrincipalName')})",
+                    args.verbose
+                )
 
             # Add authenticated user to participant list
             if my_user_id not in participant_ids:
@@ -1205,17 +2073,14 @@ Examples:
                 )
                 return EXIT_NO_MATCHES
 
-        # Export each chat
-        for chat in chats_to_export:
-            chat_id = chat["id"]
-            chat_type = chat.get("chatType", "unknown")
-
-            print_progress(f"\nExporting chat: {chat_id} (type: {chat_type})", args.verbose)
-
-            # Get messages
-            messages, actual_until = get_chat_messages_filtered(
+        def fetch_messages(chat: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], datetime]:
+            print_progress(
+                f"\nExporting chat: {chat['id']} (type: {chat.get('chatType', 'unknown')})",
+                args.verbose
+            )
+            return get_chat_messages_filtered(
                 client,
-                chat_id,
+                chat["id"],
                 since,
                 until,
                 args.only_mine,
@@ -1223,54 +2088,88 @@ Examples:
                 args.exclude_system_messages
             )
 
-            if not messages:
-                print_progress("No messages in date range", args.verbose)
-                continue
+        # Shared by every chat in this export
+        date_range_start = since.isoformat()
+        exported_at = datetime.now(timezone.utc).isoformat()
+
+        # Messages for several chats are fetched concurrently; each chat is
+        # written out in order as soon as its own messages are in.  At most
+        # ``workers`` fetches run ahead of the chat being written, so a slow
+        # chat does not leave every later chat's messages waiting in memory.
+        workers = max(1, min(MESSAGE_FETCH_WORKERS, len(chats_to_export)))
+        fetch_pool = ThreadPoolExecutor(max_workers=workers)
+
+        def fetched_in_order() -> Iterator[Tuple[Dict[str, Any], Tuple[List[Dict[str, Any]], datetime]]]:
+            remaining = iter(chats_to_export)
+            pending = deque(
+                (chat, fetch_pool.submit(fetch_messages, chat))
+                for chat in islice(remaining, workers)
+            )
+            while pending:
+                chat, future = pending.popleft()
+                result = future.result()
+                next_chat = next(remaining, None)
+                if next_chat is not None:
+                    pending.append((next_chat, fetch_pool.submit(fetch_messages, next_chat)))
+                yield chat, result
 
-            # Process messages
-            processed_messages = [process_message(msg) for msg in messages]
-
-            # Get participant details
-            members = chat.get("members", [])
-            participants = []
-            for member in members:
-                participants.append({
-                    "id": member.get("userId", ""),
-                    "displayName": member.get("displayName", "Unknown"),
-                    "userPrincipalName": member.get("email", "")
-                })
-
-            # Build export data
-            export_data = {
-                "chat_id": chat_id,
-                "chat_type": chat_type,
-                "participants": participants,
-                "date_range_start": since.isoformat(),
-                "date_range_end": actual_until.isoformat(),
-                "exported_at_utc": datetime.now(timezone.utc).isoformat(),
-                "message_count": len(processed_messages),
-                "messages": processed_messages
-            }
+        try:
+            # Export each chat
+            for chat, (messages, actual_until) in fetched_in_order():
+                chat_id = chat["id"]
+                chat_type = chat.get("chatType", "unknown")
 
-            # Determine output path
-            output_path = args.output
-            if not output_path and len(chats_to_export) == 1:
-                # Single chat, use default filename
-                output_path = f"./output.{args.format}"
-            elif not output_path:
-                # Multiple chats, use chat ID in filename
-                output_path = f"./out/chat_{chat_id[:8]}.{args.format}"
-
-            # Export
-            if args.format == "json":
-                export_to_json(export_data, output_path)
-            else:
-                export_to_txt(export_data, output_path)
+                if not messages:
+                    print_progress(f"No messages in date range for chat {chat_id}", args.verbose)
+                    continue
 
-            print_progress(
-                f"Successfully exported {len(processed_messages)} messages",
-                args.verbose
-            )
+                # Process messages
+                # Processed lazily, one message at a time, as the export is written
+                processed_messages = map(process_message, messages)
+
+                # Get participant details
+                participants = [
+                    {
+                        "id": member.get("userId", ""),
+                        "displayName": member.get("displayName", "Unknown"),
+                        "userPrincipalName": member.get("email", "")
+                    }
+                    for member in chat.get("members", [])
+                ]
+
+                # Build export data
+                export_data = {
+                    "chat_id": chat_id,
+                    "chat_type": chat_type,
+                    "participants": participants,
+                    "date_range_start": date_range_start,
+                    "date_range_end": actual_until.isoformat(),
+                    "exported_at_utc": exported_at,
+                    "message_count": len(messages),  # process_message is one-to-one
+                    "messages": processed_messages
+                }
+
+                # Determine output path
+                output_path = args.output
+                if not output_path and len(chats_to_export) == 1:
+                    # Single chat, use default filename
+                    output_path = f"./output.{args.format}"
+                elif not output_path:
+                    # Multiple chats, use chat ID in filename
+                    output_path = f"./out/chat_{chat_id[:8]}.{args.format}"
+
+                # Export
+                if args.format == "json":
+                    export_to_json(export_data, output_path)
+                else:
+                    export_to_txt(export_data, output_path)
+
+                print_progress(
+                    f"Successfully exported {len(messages)} messages from chat {chat_id}",
+                    args.verbose
+                )
+        finally:
+            fetch_pool.shutdown(cancel_futures=True)
 
         return EXIT_SUCCESS
 
@@ -1,20 +1,42 @@
 #!/usr/bin/env python
 """Docker live container smoke test"""
 import requests
+from requests.adapters import HTTPAdapter
 import time
 import re
 
+JS_MODULES_RE = re.compile(r'(?:api|business|ui|storage|app)\.js')
+
+# One session for all probes so keep-alive connections are reused
+session = requests.Session()
+session.mount("http://localhost:8000", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+
+
+def wait_ready(url, timeout=10):
+    """Poll url until it answers 200, for at most timeout seconds."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if session.get(url, timeout=0.5).status_code == 200:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(0.1)
+    return False
+
+
 print("=" * 60)
 print("DOCKER SMOKE TEST - Live Container Verification")
 print("=" * 60)
 
-# Give the web container a moment to start
-time.sleep(2)
+# Wait for the containers to start instead of sleeping a fixed time
+wait_ready("http://localhost:8000/api/auth/status")
+wait_ready("http://localhost:8080/")
 
 # Test 1: API Health Check
 print("\n[TEST 1] API Health Check - GET http://localhost:8000/api/auth/status")
 try:
-    resp = requests.get("http://localhost:8000/api/auth/status", timeout=5)
+    resp = session.get("http://localhost:8000/api/auth/status", timeout=5)
     print(f"  Status Code: {resp.status_code}")
     print(f"  Response: {resp.json()}")
     assert resp.status_code == 200, "Should return 200"
@@ -25,25 +47,27 @@ except Exception as e:
 # Test 2: Web UI
 print("\n[TEST 2] Web UI - GET http://localhost:8080/")
 try:
-    resp = requests.get("http://localhost:8080/", timeout=5)
+    resp = session.get("http://localhost:8080/", timeout=5)
+    body = resp.text
     print(f"  Status Code: {resp.status_code}")
     print(f"  Content-Type: {resp.headers.get('content-type')}")
-    print(f"  HTML size: {len(resp.text)} bytes")
+    print(f"  HTML size: {len(body)} bytes")
     
     # Check for API_BASE injection
-    if 'window.API_BASE' in resp.text:
+    if 'window.API_BASE' in body:
         print("  ✓ API_BASE injection detected")
         # Extract the injected value
-        match = re.search(r'window\.API_BASE = "([^"]+)"', resp.text)
+        match = re.search(r'window\.API_BASE = "([^"]+)"', body)
         if match:
             print(f"  ✓ Injected URL: {match.group(1)}")
     
-    # Check for JS modules
-    has_api = 'api.js' in resp.text
-    has_business = 'business.js' in resp.text
-    has_ui = 'ui.js' in resp.text
-    has_storage = 'storage.js' in resp.text
-    has_app = 'app.js' in resp.text
+    # Check for JS modules (one scan for all names)
+    found = set(JS_MODULES_RE.findall(body))
+    has_api = 'api.js' in found
+    has_business = 'business.js' in found
+    has_ui = 'ui.js' in found
+    has_storage = 'storage.js' in found
+    has_app = 'app.js' in found
     
     modules_ok = all([has_api, has_business, has_ui, has_storage, has_app])
     print(f"  JS Modules: api.js={has_api}, business.js={has_business}, ui.js={has_ui}, storage.js={has_storage}, app.js={has_app}")
@@ -58,7 +82,7 @@ except Exception as e:
 # Test 3: Run History Endpoint
 print("\n[TEST 3] Run History - GET http://localhost:8000/api/runs/history")
 try:
-    resp = requests.get("http://localhost:8000/api/runs/history", timeout=5)
+    resp = session.get("http://localhost:8000/api/runs/history", timeout=5)
     print(f"  Status Code: {resp.status_code}")
     print(f"  Response: {resp.json()}")
     assert resp.status_code == 200, "Should return 200"
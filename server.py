@@ -3,41 +3,173 @@ Application entry point – FastAPI server.
 
 Serves:
   /api/*   → REST API routes
-  /*       → Static files from /web  (SPA fallback)
+  /*       → Static files from /web, cached in memory (SPA fallback)
 """
 
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from starlette.responses import FileResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+from starlette.concurrency import run_in_threadpool
 
+from api import run_manager
 from api.routes import router as api_router
 
+WEB_DIR = Path("web")
+# DEV=1 enables auto-reload, and serves web/ from disk on every request
+DEV = bool(os.environ.get("DEV"))
+# Responses smaller than this are not worth compressing
+GZIP_MINIMUM_SIZE = 1024
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup work for each server process."""
+    # Fail runs whose owning process has exited.  This runs in every worker,
+    # including ones respawned after a crash, and leaves runs a live sibling
+    # worker owns alone.
+    run_manager.recover_interrupted_runs()
+    yield
+    # Spawned message-processing children would otherwise outlive the worker
+    run_manager.shutdown_process_pool()
+
+
 app = FastAPI(
     title="Teams Chat Export",
     version="2.0.0",
     description="Web UI & REST API for Microsoft Teams chat export",
+    # The API router already defaults to orjson; this makes it the default
+    # for routes declared on the app itself too
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
-# CORS – allow the dev server (Vite / Live Server) if needed
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# CORS – needed when the web UI is served from another origin (the Docker
+# web container, Vite / Live Server).  CORS_ORIGINS is a comma-separated
+# list of allowed origins (default "*"); set it empty for same-origin
+# deployments to skip the middleware entirely.
+CORS_ORIGINS = [o.strip() for o in os.environ.get("CORS_ORIGINS", "*").split(",") if o.strip()]
+if CORS_ORIGINS:
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=CORS_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["ETag", "X-Poll-Interval-Ms"],
+    )
+
+
+# Result-file downloads, which are never gzipped
+_DOWNLOAD_PATH = re.compile(r"/api/runs/[^/]+/download")
+
+
+class _APIGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that leaves result-file downloads alone."""
+
+    async def __call__(self, scope, receive, send) -> None:
+        # Downloads stream large files in 1 MiB chunks with a Content-Length
+        # (so clients can show progress); gzipping them would run on the
+        # event loop and drop that header.
+        if scope["type"] == "http" and _DOWNLOAD_PATH.fullmatch(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+# Chat JSON and API responses compress well.  Static files are compressed
+# once at startup below, and already-encoded responses pass through untouched.
+app.add_middleware(_APIGZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE, compresslevel=5)
 
 # Mount API routes
 app.include_router(api_router)
 
-# Serve static web files at root (SPA fallback)
-app.mount("/", StaticFiles(directory="web", html=True), name="web")
+# ── Static web files ──────────────────────────────────────────────────────
+# The SPA is a handful of small files, so they are read once at startup and
+# served from memory instead of being stat'ed and opened on every request.
+# Asset names are not content-hashed, so responses are revalidated
+# (no-cache) and answered with a 304 when the ETag still matches.  Text
+# assets are also gzipped once here rather than per request.  With DEV set
+# they are re-read per request instead, since the reloader only watches
+# .py files and edits to the web UI would otherwise need a restart.
+
+StaticEntry = Tuple[bytes, str, str, Optional[bytes]]
+
+
+def _load_static(root: Path) -> Dict[str, StaticEntry]:
+    """Map URL paths under ``root`` to ``(body, media_type, etag, gzipped body)``."""
+    files: Dict[str, StaticEntry] = {}
+    if not root.is_dir():
+        return files
+    for path in root.rglob("*"):
+        if path.is_file():
+            body = path.read_bytes()
+            media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+            etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+            gzipped = None
+            if len(body) >= GZIP_MINIMUM_SIZE:
+                compressed = gzip.compress(body, compresslevel=6, mtime=0)
+                if len(compressed) < len(body):
+                    gzipped = compressed
+            files[path.relative_to(root).as_posix()] = (body, media_type, etag, gzipped)
+    return files
+
+
+_static_files = {} if DEV else _load_static(WEB_DIR)
+
+
+@app.api_route("/{path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+async def web(path: str, request: Request):
+    """Serve the web UI, falling back to index.html for client-side routes."""
+    static_files = await run_in_threadpool(_load_static, WEB_DIR) if DEV else _static_files
+    entry = static_files.get(path) or static_files.get(f"{path.rstrip('/')}/index.html".lstrip("/"))
+    if entry is None:
+        # Missing assets and unknown API routes stay 404s
+        if path.startswith("api/") or "." in path.rsplit("/", 1)[-1]:
+            raise HTTPException(status_code=404, detail="Not Found")
+        entry = static_files.get("index.html")
+        if entry is None:
+            raise HTTPException(status_code=404, detail="Not Found")
+
+    body, media_type, etag, gzipped = entry
+    headers = {"Cache-Control": "no-cache"}
+    if gzipped is not None:
+        headers["Vary"] = "Accept-Encoding"
+        if "gzip" in request.headers.get("accept-encoding", ""):
+            body = gzipped
+            etag = f'{etag[:-1]}-gz"'
+            headers["Content-Encoding"] = "gzip"
+    headers["ETag"] = etag
+    if request.headers.get("if-none-match") == etag:
+        headers.pop("Content-Encoding", None)
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=media_type, headers=headers)
 
 
 def main() -> None:
-    uvicorn.run("server:app", host="127.0.0.1", port=8080, reload=True)
+    # Without DEV, WEB_CONCURRENCY sets the worker count; it defaults to 1
+    # because device-code logins and running jobs live in the worker process
+    # that started them.  loop/http "auto" use uvloop and httptools
+    # (installed with uvicorn[standard]) when present.
+    uvicorn.run(
+        "server:app",
+        host="127.0.0.1",
+        port=8080,
+        reload=DEV,
+        workers=None if DEV else int(os.environ.get("WEB_CONCURRENCY", "1")),
+        loop="auto",
+        http="auto",
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,87 @@
+"""Tests for the web UI authentication manager."""
+
+import time
+
+import pytest
+from unittest.mock import Mock, patch
+
+from api import auth_manager
+from api.auth_manager import DEVICE_FLOW_MAX_ERRORS, PendingFlow, poll_device_code_flow
+
+
+@pytest.fixture
+def pending_flow(monkeypatch):
+    """Register a device-code flow whose token requests can be scripted."""
+    monkeypatch.setattr(auth_manager, "_pending_flows", {})
+    entry = PendingFlow(
+        app=Mock(),
+        flow={"user_code": "ABC"},
+        cache=Mock(),
+        interval=5.0,
+        next_poll_at=0.0,
+        created_at=time.monotonic(),
+    )
+    auth_manager._pending_flows["flow1"] = entry
+    return entry
+
+
+class TestPollDeviceCodeFlow:
+    """Test device-code flow polling."""
+
+    def test_network_error_is_not_throttling(self, pending_flow):
+        """Test that transport errors are reported, not treated as slow_down."""
+        pending_flow.app.acquire_token_by_device_flow.side_effect = ConnectionError("unreachable")
+
+        result = poll_device_code_flow("flow1")
+
+        assert result["status"] == "pending"
+        assert "Could not reach Azure AD" in result["error"]
+        assert pending_flow.interval == 5.0
+        assert pending_flow.error_streak == 1
+
+    def test_repeated_network_errors_fail_the_flow(self, pending_flow):
+        """Test that the flow fails after DEVICE_FLOW_MAX_ERRORS transport errors in a row."""
+        pending_flow.app.acquire_token_by_device_flow.side_effect = ConnectionError("unreachable")
+
+        for _ in range(DEVICE_FLOW_MAX_ERRORS - 1):
+            pending_flow.next_poll_at = 0.0
+            assert poll_device_code_flow("flow1")["status"] == "pending"
+        pending_flow.next_poll_at = 0.0
+        result = poll_device_code_flow("flow1")
+
+        assert result["status"] == "error"
+        assert "flow1" not in auth_manager._pending_flows
+
+    def test_slow_down_backs_off(self, pending_flow):
+        """Test that a slow_down answer doubles the polling interval."""
+        pending_flow.app.acquire_token_by_device_flow.return_value = {"error": "slow_down"}
+
+        assert poll_device_code_flow("flow1") == {"status": "pending"}
+        assert pending_flow.interval == 10.0
+
+
+class TestForceLogin:
+    """Test that force_login starts over from the current configuration."""
+
+    @pytest.fixture
+    def env_dir(self, tmp_path, monkeypatch):
+        """Run in an empty directory, with credentials only from its .env."""
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.delenv("TEAMS_TENANT_ID", raising=False)
+        monkeypatch.delenv("TEAMS_CLIENT_ID", raising=False)
+        monkeypatch.setattr(auth_manager, "_pending_flows", {})
+        auth_manager._reset_clients()
+        yield tmp_path
+        # Drops the variables read from the test .env
+        auth_manager._reset_clients()
+
+    def test_force_login_rereads_env(self, env_dir):
+        """Test that a changed .env is picked up by the next force_login."""
+        (env_dir / ".env").write_text("TEAMS_TENANT_ID=tenant\nTEAMS_CLIENT_ID=client-old\n")
+        with patch("msal.PublicClientApplication") as pca:
+            pca.return_value.initiate_device_flow.return_value = {"user_code": "ABC", "message": "Sign in"}
+            auth_manager.force_login()
+            (env_dir / ".env").write_text("TEAMS_TENANT_ID=tenant\nTEAMS_CLIENT_ID=client-new\n")
+            auth_manager.force_login()
+
+        assert [c.kwargs["client_id"] for c in pca.call_args_list] == ["client-old", "client-new"]
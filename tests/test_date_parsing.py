@@ -2,7 +2,8 @@
 
 import pytest
 from datetime import datetime, timezone
-from cli.teams_chat_export import parse_date
+from unittest.mock import Mock
+from cli.teams_chat_export import get_chat_messages_filtered, parse_date
 
 
 class TestDateParsing:
@@ -67,3 +68,65 @@ class TestDateParsing:
         assert result.month == 2
         assert result.day == 29
 
+
+class TestMessageDateFiltering:
+    """Test client-side date filtering of chat messages."""
+
+    def _filter(self, created, since, until=None):
+        client = Mock()
+        client.verbose = False
+        client.get_chat_messages.return_value = [
+            {"id": str(i), "createdDateTime": c} for i, c in enumerate(created)
+        ]
+        messages, actual_until = get_chat_messages_filtered(client, "chat1", since, until)
+        return [m["id"] for m in messages], actual_until
+
+    def test_bounds_with_fractional_timestamps(self):
+        """Test since is inclusive and until exclusive for Graph timestamps."""
+        ids, _ = self._filter(
+            [
+                "2025-06-01T09:59:59.999Z",
+                "2025-06-01T10:00:00Z",
+                "2025-06-01T10:30:00.1234567Z",
+                "2025-06-01T11:00:00.001Z",
+            ],
+            datetime(2025, 6, 1, 10, tzinfo=timezone.utc),
+            datetime(2025, 6, 1, 11, tzinfo=timezone.utc),
+        )
+        assert ids == ["1", "2"]
+
+    def test_sub_second_until_and_offsets(self):
+        """Test bounds that cannot be compared as strings still filter exactly."""
+        ids, _ = self._filter(
+            ["2025-06-01T10:00:00.200Z", "2025-06-01T10:00:00.400Z", "2025-06-01T12:00:00+02:00"],
+            datetime(2025, 6, 1, 10, tzinfo=timezone.utc),
+            datetime(2025, 6, 1, 10, 0, 0, 300000, tzinfo=timezone.utc),
+        )
+        assert ids == ["0", "2"]
+
+    def test_until_derived_from_latest_message(self):
+        """Test the open-ended until is one second after the newest message."""
+        ids, actual_until = self._filter(
+            ["2025-06-01T10:00:05.500Z", "2025-06-01T10:00:01Z"],
+            datetime(2025, 6, 1, 10, tzinfo=timezone.utc),
+        )
+        assert ids == ["1", "0"]
+        assert actual_until == datetime(2025, 6, 1, 10, 0, 6, tzinfo=timezone.utc)
+
+    def test_only_mine_skips_system_messages_and_shares_sender_strings(self):
+        """Test only_mine copes with "from": null and senders share one string."""
+        client = Mock()
+        client.verbose = False
+        client.get_chat_messages.return_value = [
+            {"id": "0", "createdDateTime": "2025-06-01T10:00:00Z", "from": None},
+            {"id": "1", "createdDateTime": "2025-06-01T10:00:01Z",
+             "from": {"user": {"id": "".join(["me", "123"]), "displayName": "Me"}}},
+            {"id": "2", "createdDateTime": "2025-06-01T10:00:02Z",
+             "from": {"user": {"id": "".join(["me", "123"]), "displayName": "Me"}}},
+        ]
+        messages, _ = get_chat_messages_filtered(
+            client, "chat1", datetime(2025, 6, 1, 10, tzinfo=timezone.utc),
+            only_mine=True, my_user_id="me123"
+        )
+        assert [m["id"] for m in messages] == ["1", "2"]
+        assert messages[0]["from"]["user"]["id"] is messages[1]["from"]["user"]["id"]
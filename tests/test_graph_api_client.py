@@ -2,12 +2,19 @@
 
 import pytest
 import responses
+from unittest.mock import Mock, patch
 from cli.teams_chat_export import (
+    AdaptiveThrottle,
+    BadRequestError,
     GraphAPIClient,
     PermissionError,
     NotFoundError,
     MaxRetriesExceeded,
-    GRAPH_API_BASE_URL
+    GRAPH_API_BASE_URL,
+    iter_chats_with_members,
+    load_cached_profile,
+    prefetched_iter,
+    save_cached_profile,
 )
 
 
@@ -33,6 +40,14 @@ class TestGraphAPIClient:
         assert result["id"] == "user123"
         assert result["displayName"] == "Test User"
     
+    def test_normalize_chat_id(self, client):
+        """Test that raw and pre-encoded chat IDs encode the same way."""
+        raw = "19:abc_def@thread.v2"
+        assert client._normalize_chat_id(raw) == "19%3Aabc_def%40thread.v2"
+        assert client._normalize_chat_id("19%3Aabc_def%40thread.v2") == "19%3Aabc_def%40thread.v2"
+        # A bare '%' that is not an encoded byte is kept and encoded
+        assert client._normalize_chat_id("50%off") == "50%25off"
+
     @responses.activate
     def test_make_request_404(self, client):
         """Test 404 not found error."""
@@ -62,6 +77,21 @@ class TestGraphAPIClient:
         with pytest.raises(PermissionError) as exc_info:
             client._make_request("/me/chats")
         assert "Insufficient privileges" in str(exc_info.value)
+
+    @responses.activate
+    def test_make_request_403_non_json_body(self, client):
+        """Test that a 403 with a non-JSON body fails at once instead of retrying."""
+        responses.add(
+            responses.GET,
+            f"{GRAPH_API_BASE_URL}/me/chats",
+            body="<html>Forbidden</html>",
+            status=403
+        )
+
+        with pytest.raises(PermissionError) as exc_info:
+            client._make_request("/me/chats")
+        assert "Insufficient permissions" in str(exc_info.value)
+        assert len(responses.calls) == 1
     
     @responses.activate
     def test_make_request_429_retry(self, client):
@@ -114,6 +144,30 @@ class TestGraphAPIClient:
         assert items[1]["id"] == "chat2"
         assert items[2]["id"] == "chat3"
     
+    @responses.activate
+    def test_prefetched_pagination(self, client):
+        """Test prefetching preserves order and surfaces producer errors."""
+        responses.add(
+            responses.GET,
+            f"{GRAPH_API_BASE_URL}/me/chats",
+            json={
+                "value": [{"id": "chat1"}, {"id": "chat2"}],
+                "@odata.nextLink": f"{GRAPH_API_BASE_URL}/me/chats?$skip=2"
+            },
+            status=200
+        )
+        responses.add(
+            responses.GET,
+            f"{GRAPH_API_BASE_URL}/me/chats",
+            status=404
+        )
+        
+        it = prefetched_iter(client._paginate("/me/chats"), ahead=1)
+        assert next(it)["id"] == "chat1"
+        assert next(it)["id"] == "chat2"
+        with pytest.raises(NotFoundError):
+            next(it)
+    
     @responses.activate
     def test_get_my_chats(self, client):
         """Test getting user's chats."""
@@ -133,7 +187,30 @@ class TestGraphAPIClient:
         assert len(chats) == 2
         assert chats[0]["id"] == "chat1"
         assert chats[1]["chatType"] == "group"
-    
+        assert responses.calls[0].request.params["$select"] == "id,chatType,topic"
+
+    @responses.activate
+    def test_get_chat_by_id_and_profile_memoized(self, client):
+        """Test repeated chat and profile lookups reuse the first response."""
+        responses.add(
+            responses.GET,
+            f"{GRAPH_API_BASE_URL}/chats/chat1",
+            json={"id": "chat1", "chatType": "group"},
+            status=200
+        )
+        responses.add(
+            responses.GET,
+            f"{GRAPH_API_BASE_URL}/me",
+            json={"id": "me", "displayName": "Me"},
+            status=200
+        )
+
+        chat = client.get_chat_by_id("chat1")
+        chat["members"] = []
+        assert client.get_chat_by_id("chat1") == {"id": "chat1", "chatType": "group"}
+        assert client.get_my_profile() is client.get_my_profile()
+        assert len(responses.calls) == 2
+
     @responses.activate
     def test_get_chat_members(self, client):
         """Test getting chat members."""
@@ -152,7 +229,175 @@ class TestGraphAPIClient:
         members = client.get_chat_members("chat123")
         assert len(members) == 2
         assert members[0]["userId"] == "user1"
-    
+
+    @responses.activate
+    def test_get_chat_members_keeps_only_read_fields(self, client):
+        """Test members are reduced to the fields the exports use."""
+        responses.add(
+            responses.GET,
+            f"{GRAPH_API_BASE_URL}/chats/chat123/members",
+            json={"value": [{
+                "@odata.type": "#microsoft.graph.aadUserConversationMember",
+                "roles": ["owner"],
+                "tenantId": "tenant1",
+                "userId": "user1",
+                "displayName": "User 1",
+                "email": "user1@example.com"
+            }]},
+            status=200
+        )
+
+        assert client.get_chat_members("chat123") == [
+            {"userId": "user1", "displayName": "User 1", "email": "user1@example.com"}
+        ]
+
+    @responses.activate
+    def test_make_request_400_not_retried(self, client):
+        """Test that a 400 fails immediately instead of being retried."""
+        responses.add(
+            responses.GET,
+            f"{GRAPH_API_BASE_URL}/me/chats",
+            json={"error": {"message": "Invalid filter clause"}},
+            status=400
+        )
+
+        with pytest.raises(BadRequestError, match="Invalid filter clause"):
+            client._make_request("/me/chats")
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_paginate_with_filter_falls_back(self, client):
+        """Test that a rejected $filter is retried without it."""
+        responses.add(
+            responses.GET,
+            f"{GRAPH_API_BASE_URL}/me/chats",
+            json={"error": {"message": "Invalid filter clause"}},
+            status=400
+        )
+        responses.add(
+            responses.GET,
+            f"{GRAPH_API_BASE_URL}/me/chats",
+            json={"value": [{"id": "chat1"}]},
+            status=200
+        )
+
+        chats = list(client._paginate_with_filter("/me/chats", {}, "chatType eq 'group'"))
+        assert chats == [{"id": "chat1"}]
+        assert "filter" in responses.calls[0].request.url
+        assert "filter" not in responses.calls[1].request.url
+
+    @responses.activate
+    def test_get_chat_members_memoized(self, client):
+        """Test that members are fetched once per chat and shared with the batch path."""
+        responses.add(
+            responses.GET,
+            f"{GRAPH_API_BASE_URL}/chats/chat123/members",
+            json={"value": [{"userId": "user1"}]},
+            status=200
+        )
+
+        assert client.get_chat_members("chat123") == [{"userId": "user1"}]
+        assert client.get_chat_members("chat123") == [{"userId": "user1"}]
+        assert client.get_chat_members_batch(["chat123"]) == {"chat123": [{"userId": "user1"}]}
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_get_chat_members_batch(self, client):
+        """Test batched member lookups with per-request errors and retries."""
+        responses.add(
+            responses.POST,
+            f"{GRAPH_API_BASE_URL}/$batch",
+            json={
+                "responses": [
+                    {"id": "0", "status": 200, "body": {"value": [{"userId": "user1"}]}},
+                    {"id": "1", "status": 403, "body": {"error": {"code": "Forbidden", "message": "InsufficientPrivileges"}}},
+                    {"id": "2", "status": 404, "body": {"error": {"code": "NotFound", "message": "Gone"}}},
+                    {"id": "3", "status": 429, "headers": {"Retry-After": "3"}, "body": {}},
+                ]
+            },
+            status=200
+        )
+        responses.add(
+            responses.GET,
+            f"{GRAPH_API_BASE_URL}/chats/chat4/members",
+            json={"value": [{"userId": "user4"}]},
+            status=200
+        )
+
+        with patch("cli.teams_chat_export.time.sleep") as sleep:
+            results = client.get_chat_members_batch(["chat1", "chat2", "chat3", "chat4"])
+        sleep.assert_called_once_with(3)
+        assert results["chat1"] == [{"userId": "user1"}]
+        assert isinstance(results["chat2"], PermissionError)
+        assert "InsufficientPrivileges" in str(results["chat2"])
+        assert isinstance(results["chat3"], NotFoundError)
+        assert results["chat4"] == [{"userId": "user4"}]
+        assert len(responses.calls) == 2
+
+    @responses.activate
+    def test_get_chat_members_batch_falls_back_per_chat(self, client):
+        """Test that a rejected batch is retried with per-chat requests."""
+        responses.add(
+            responses.POST,
+            f"{GRAPH_API_BASE_URL}/$batch",
+            json={"error": {"message": "Forbidden"}},
+            status=403
+        )
+        for chat_id in ("chat1", "chat2", "chat3"):
+            responses.add(
+                responses.GET,
+                f"{GRAPH_API_BASE_URL}/chats/{chat_id}/members",
+                json={"value": [{"userId": f"{chat_id}-user"}]},
+                status=200
+            )
+
+        results = client.get_chat_members_batch(["chat1", "chat2", "chat3"])
+        assert results == {
+            "chat1": [{"userId": "chat1-user"}],
+            "chat2": [{"userId": "chat2-user"}],
+            "chat3": [{"userId": "chat3-user"}],
+        }
+
+    @responses.activate
+    def test_iter_chats_with_members_uses_expanded_members(self, client):
+        """Test that only chats without inline members are batch-fetched."""
+        responses.add(
+            responses.POST,
+            f"{GRAPH_API_BASE_URL}/$batch",
+            json={"responses": [{"id": "0", "status": 200, "body": {"value": [{"userId": "user2"}]}}]},
+            status=200
+        )
+        chats = [
+            {"id": "chat1", "members": [{"userId": "user1"}]},
+            {"id": "chat2"},
+            {"id": "chat3", "members": []},
+        ]
+
+        result = list(iter_chats_with_members(client, chats))
+        assert [(chat["id"], members) for chat, members, _ in result] == [
+            ("chat1", [{"userId": "user1"}]),
+            ("chat2", [{"userId": "user2"}]),
+            ("chat3", []),
+        ]
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_iter_chats_with_members_skips_unwanted_fetches(self, client):
+        """Test that chats rejected by fetch_members are yielded without a request."""
+        chats = [
+            {"id": "chat1", "members": [{"userId": "user1"}]},
+            {"id": "meeting1", "chatType": "meeting"},
+        ]
+
+        result = list(iter_chats_with_members(
+            client, chats, fetch_members=lambda chat: chat.get("chatType") != "meeting"
+        ))
+        assert result == [
+            (chats[0], [{"userId": "user1"}], None),
+            (chats[1], None, None),
+        ]
+        assert len(responses.calls) == 0
+
     @responses.activate
     def test_search_users_by_email(self, client):
         """Test searching users by email."""
@@ -175,3 +420,123 @@ class TestGraphAPIClient:
         assert len(users) == 1
         assert users[0]["userPrincipalName"] == "test@example.com"
 
+    @responses.activate
+    def test_search_users_bulk_single_request(self, client):
+        """Test that several identifiers are searched with one combined filter."""
+        responses.add(
+            responses.GET,
+            f"{GRAPH_API_BASE_URL}/users",
+            json={
+                "value": [
+                    {"id": "u1", "displayName": "Alice Smith", "userPrincipalName": "alice@example.com"},
+                    {"id": "u2", "displayName": "Bob O'Neil", "userPrincipalName": "bob@example.com"},
+                ]
+            },
+            status=200
+        )
+
+        results = client.search_users_bulk(["ALICE@example.com", "Bob O'"])
+        assert [u["id"] for u in results["ALICE@example.com"]] == ["u1"]
+        assert [u["id"] for u in results["Bob O'"]] == ["u2"]
+        assert len(responses.calls) == 1
+        assert responses.calls[0].request.params["$filter"] == (
+            "userPrincipalName in ('ALICE@example.com') or startswith(displayName, 'Bob O''')"
+        )
+
+    @responses.activate
+    def test_search_users_quotes_filter_values(self, client):
+        """Test that apostrophes in a search are escaped in the OData filter."""
+        responses.add(
+            responses.GET,
+            f"{GRAPH_API_BASE_URL}/users",
+            json={"value": []},
+            status=200
+        )
+
+        client.search_users("Bob O'Neil")
+        assert responses.calls[0].request.params["$filter"] == "startswith(displayName, 'Bob O''Neil')"
+
+
+
+class TestProfileCache:
+    """Test the on-disk profile cache used to skip /me on warm runs."""
+
+    def test_round_trip_and_expiry(self, tmp_path, monkeypatch):
+        """Test that cached profiles are keyed per app and expire."""
+        import cli.teams_chat_export as tce
+
+        monkeypatch.setattr(tce, "PROFILE_CACHE_FILE", str(tmp_path / "profile.json"))
+        assert load_cached_profile("tenant", "client") is None
+
+        save_cached_profile("tenant", "client", {"displayName": "Test User"})
+        assert load_cached_profile("tenant", "client") == {"displayName": "Test User"}
+        assert load_cached_profile("tenant", "other-client") is None
+
+        monkeypatch.setattr(tce, "PROFILE_CACHE_TTL", 0)
+        assert load_cached_profile("tenant", "client") is None
+
+    def test_device_code_login_forgets_profile(self, tmp_path, monkeypatch):
+        """Test that a fresh device-code login drops the previous account's profile."""
+        import cli.teams_chat_export as tce
+
+        monkeypatch.setattr(tce, "PROFILE_CACHE_FILE", str(tmp_path / "profile.json"))
+        monkeypatch.setattr(tce, "TOKEN_CACHE_FILE", str(tmp_path / "token_cache.json"))
+        save_cached_profile("tenant", "client", {"id": "old-user"})
+        save_cached_profile("tenant", "other-client", {"id": "other-user"})
+
+        app = Mock()
+        app.get_accounts.return_value = []
+        app.initiate_device_flow.return_value = {"user_code": "ABC", "message": "Sign in"}
+        app.acquire_token_by_device_flow.return_value = {"access_token": "token"}
+        with patch("msal.PublicClientApplication", return_value=app):
+            assert tce.authenticate("tenant", "client", verbose=False) == "token"
+
+        assert load_cached_profile("tenant", "client") is None
+        assert load_cached_profile("tenant", "other-client") == {"id": "other-user"}
+
+    def test_save_token_cache_replaces_file_privately(self, tmp_path, monkeypatch):
+        """Test that the token cache is swapped in whole with owner-only access."""
+        import os
+        import stat
+        import cli.teams_chat_export as tce
+
+        path = tmp_path / "token_cache.json"
+        path.write_text("old")
+        monkeypatch.setattr(tce, "TOKEN_CACHE_FILE", str(path))
+        cache = Mock(has_state_changed=True)
+        cache.serialize.return_value = '{"AccessToken": {}}'
+
+        tce.save_token_cache(cache)
+
+        assert path.read_text() == '{"AccessToken": {}}'
+        assert cache.has_state_changed is False
+        assert os.listdir(tmp_path) == ["token_cache.json"]
+        if os.name == "posix":
+            assert stat.S_IMODE(path.stat().st_mode) == 0o600
+
+
+class TestAdaptiveThrottle:
+    """Test client-wide pacing after throttling."""
+
+    def test_unpaced_until_throttled_then_recovers(self):
+        """Test that pacing starts on a throttle and stops once the rate recovers."""
+        throttle = AdaptiveThrottle(max_rate=4.0, min_rate=1.0, step=1.0)
+        clock = [100.0]
+
+        def sleep(seconds):
+            clock[0] += seconds
+
+        with patch("cli.teams_chat_export.time.monotonic", lambda: clock[0]), \
+             patch("cli.teams_chat_export.time.sleep", side_effect=sleep) as mock_sleep:
+            throttle.acquire()
+            mock_sleep.assert_not_called()
+
+            throttle.on_throttled(2.0)
+            assert throttle.rate == 2.0
+            throttle.acquire()  # waits out the pause
+            throttle.acquire()  # then spaced at 1 / rate
+            assert clock[0] == pytest.approx(102.5)
+
+            throttle.on_success()
+            throttle.on_success()
+            assert throttle.rate is None
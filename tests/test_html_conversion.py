@@ -1,5 +1,8 @@
 """Tests for HTML to text conversion."""
 
+from unittest.mock import patch
+
+import html2text
 import pytest
 from cli.teams_chat_export import html_to_text
 
@@ -94,3 +97,12 @@ class TestHtmlToText:
         assert "Item 1" in result
         assert "Item 2" in result
 
+
+    def test_repeated_html_is_converted_once(self):
+        """Test identical bodies reuse the earlier conversion."""
+        html = "<div>Repeated <b>system</b> notice</div>"
+        with patch("html2text.HTML2Text", wraps=html2text.HTML2Text) as parser:
+            first = html_to_text(html)
+            second = html_to_text(html)
+        assert first == second
+        assert parser.call_count == 1
@@ -14,6 +14,9 @@ from cli.list_active_chats import (
     get_chat_last_activity,
     get_chat_display_name,
     should_include_chat,
+    get_activity_cutoff,
+    is_older_than_cutoff,
+    iter_active_chats,
     format_chat_line
 )
 
@@ -176,6 +179,17 @@ class TestShouldIncludeChat:
         result = should_include_chat(chat, None, recent_date, filters)
         assert result is True
 
+    def test_precomputed_cutoff(self):
+        """Test that a cutoff computed once is applied to each chat."""
+        chat = {"chatType": "group"}
+        filters = {"min_activity_days": 30, "max_meeting_participants": None}
+        cutoff = get_activity_cutoff(filters)
+        old_date = datetime.now(timezone.utc) - timedelta(days=40)
+        recent_date = datetime.now(timezone.utc) - timedelta(days=10)
+        assert should_include_chat(chat, None, old_date, filters, cutoff) is False
+        assert should_include_chat(chat, None, recent_date, filters, cutoff) is True
+        assert get_activity_cutoff({"min_activity_days": None}) is None
+
     def test_zero_activity_filter_includes_all(self):
         """Test that zero filter includes all chats."""
         chat = {"chatType": "group"}
@@ -185,6 +199,52 @@ class TestShouldIncludeChat:
         assert result is True
 
 
+class TestIsOlderThanCutoff:
+    """Test is_older_than_cutoff function."""
+
+    def test_old_recent_and_unknown_activity(self):
+        """Test that only chats with a known, older activity date are cut off."""
+        cutoff = get_activity_cutoff({"min_activity_days": 30})
+
+        def chat_active(days_ago):
+            created = datetime.now(timezone.utc) - timedelta(days=days_ago)
+            return {"lastMessagePreview": {"createdDateTime": created.isoformat()}}
+
+        assert is_older_than_cutoff(chat_active(40), cutoff) is True
+        assert is_older_than_cutoff(chat_active(10), cutoff) is False
+        assert is_older_than_cutoff({"id": "chat123"}, cutoff) is False
+        assert is_older_than_cutoff(chat_active(40), None) is False
+
+
+class TestIterActiveChats:
+    """Test iter_active_chats function."""
+
+    @staticmethod
+    def chat_active(chat_id, days_ago):
+        created = datetime.now(timezone.utc) - timedelta(days=days_ago)
+        return {"id": chat_id, "lastMessagePreview": {"createdDateTime": created.isoformat()}}
+
+    def test_keeps_undated_chats_after_cutoff(self):
+        """Test that chats without a preview, sorted after old ones, are kept."""
+        cutoff = get_activity_cutoff({"min_activity_days": 30})
+        chats = [
+            self.chat_active("recent", 10),
+            self.chat_active("old", 40),
+            self.chat_active("older", 50),
+            {"id": "no-preview", "lastMessagePreview": None},
+            {"id": "no-field"},
+        ]
+
+        result = [c["id"] for c in iter_active_chats(chats, cutoff)]
+
+        assert result == ["recent", "no-preview", "no-field"]
+
+    def test_no_cutoff_keeps_all(self):
+        """Test that every chat is yielded without an activity filter."""
+        chats = [self.chat_active("a", 40), {"id": "b"}]
+        assert [c["id"] for c in iter_active_chats(chats, None)] == ["a", "b"]
+
+
 class TestFormatChatLine:
     """Test format_chat_line function."""
 
@@ -1,8 +1,12 @@
 """Tests for message processing functionality."""
 
+import gzip
+import io
+import json
+
 import pytest
 from datetime import datetime, timezone
-from cli.teams_chat_export import process_message
+from cli.teams_chat_export import export_to_json, process_message, write_json_export, write_txt_export
 
 
 class TestMessageProcessing:
@@ -92,7 +96,15 @@ class TestMessageProcessing:
         
         assert result["from"]["id"] == ""
         assert result["from"]["displayName"] == "Unknown"
-    
+
+    def test_process_message_null_from_and_body(self):
+        """Test processing a system message whose from and body are null."""
+        result = process_message({"id": "msg123", "from": None, "body": None})
+
+        assert result["from"] == {"id": "", "displayName": "Unknown"}
+        assert result["body_text"] == ""
+        assert result["body_html"] == ""
+
     def test_process_message_empty_body(self):
         """Test processing message with empty body."""
         raw_message = {
@@ -113,7 +125,24 @@ class TestMessageProcessing:
         
         assert result["body_text"] == ""
         assert result["body_html"] == ""
-    
+
+    def test_process_message_plain_text_body(self):
+        """Test that plain-text bodies are kept as-is, not run through html2text."""
+        raw_message = {
+            "id": "msg123",
+            "createdDateTime": "2025-06-01T10:00:00Z",
+            "from": {"user": {"id": "user123", "displayName": "Test User"}},
+            "body": {
+                "content": "line one\nline *two* <b>",
+                "contentType": "text"
+            }
+        }
+
+        result = process_message(raw_message)
+
+        assert result["body_text"] == "line one\nline *two* <b>"
+        assert result["body_html"] == "line one\nline *two* <b>"
+
     def test_process_message_complex_html(self):
         """Test processing message with complex HTML."""
         raw_message = {
@@ -148,3 +177,75 @@ class TestMessageProcessing:
         assert "Bring laptop" in result["body_text"]
         assert "Review slides" in result["body_text"]
 
+
+class TestTxtExport:
+    """Test streaming text export."""
+    
+    def test_write_txt_export_from_generator(self):
+        """Test messages are streamed from any iterable with separators between them."""
+        data = {"chat_id": "chat1", "chat_type": "oneOnOne", "message_count": 2}
+        messages = (
+            {
+                "createdDateTime": f"2025-06-01T10:0{i}:00Z",
+                "from": {"displayName": f"User {i}"},
+                "body_text": f"Message {i}",
+                "attachments": [],
+            }
+            for i in range(2)
+        )
+        
+        out = io.StringIO()
+        write_txt_export(out, data, messages)
+        text = out.getvalue()
+        
+        assert "Chat ID:        chat1" in text
+        assert "Message Count:  2" in text
+        assert text.endswith(
+            "[2025-06-01 10:00:00 UTC] User 0:\nMessage 0\n\n"
+            + "-" * 80
+            + "\n\n[2025-06-01 10:01:00 UTC] User 1:\nMessage 1"
+        )
+
+    @pytest.mark.parametrize("created, expected", [
+        ("2025-06-01T10:00:00.123Z", "2025-06-01 10:00:00 UTC"),
+        ("2025-06-01T10:00:00+00:00", "2025-06-01 10:00:00 UTC"),
+        ("not a date", "not a date"),
+    ])
+    def test_write_txt_export_timestamp_format(self, created, expected):
+        """Test message timestamps are reformatted, or kept as-is when unparseable."""
+        out = io.StringIO()
+        write_txt_export(out, {}, [{"createdDateTime": created, "from": {"displayName": "A"}}])
+        assert f"[{expected}] A:" in out.getvalue()
+
+
+class TestJsonExport:
+    """Test JSON export."""
+
+    def test_export_to_json_matches_stdlib_format(self, tmp_path):
+        """Test that the export is indented UTF-8 JSON as json.dumps writes it."""
+        data = {"chat": {"id": "chat1", "topic": "Café ✓"}, "messages": [{"id": "1", "reactions": []}]}
+        output_path = tmp_path / "out" / "export.json"
+
+        export_to_json(data, str(output_path))
+
+        assert output_path.read_bytes() == json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+
+    def test_export_to_json_gzip_by_suffix(self, tmp_path):
+        """Test that a .gz output path is written gzip-compressed."""
+        data = {"chat_id": "chat1", "messages": [{"id": "1"}]}
+        output_path = tmp_path / "export.json.gz"
+
+        export_to_json(data, str(output_path))
+
+        assert gzip.decompress(output_path.read_bytes()) == json.dumps(data, indent=2).encode("utf-8")
+
+    @pytest.mark.parametrize("count", [0, 1, 3])
+    def test_write_json_export_from_generator(self, count):
+        """Test that streamed messages produce the same document as json.dumps."""
+        messages = [{"id": str(i), "body_text": f"Line\n{i}", "attachments": []} for i in range(count)]
+        data = {"chat_id": "chat1", "participants": [], "message_count": count, "messages": messages}
+
+        out = io.BytesIO()
+        write_json_export(out, data, (m for m in messages))
+
+        assert out.getvalue() == json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
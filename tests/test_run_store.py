@@ -0,0 +1,65 @@
+"""Tests for the persistent run store."""
+
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from api import run_store
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Point the run store at an empty database."""
+    monkeypatch.setattr(run_store, "DB_PATH", tmp_path / "runs.db")
+    monkeypatch.setattr(run_store, "_local", threading.local())
+    monkeypatch.setattr(run_store, "_schema_ready", False)
+    return run_store
+
+
+def _dead_pid() -> int:
+    """Return the PID of a process that has already exited."""
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    return proc.pid
+
+
+class TestFailOrphaned:
+    """Test recovery of runs left behind by exited processes."""
+
+    def test_only_runs_of_exited_owners_fail(self, store):
+        """Test that runs owned by a live process are left running."""
+        for run_id, status in (("live", "running"), ("dead", "running"), ("old-boot", "pending"), ("done", "completed")):
+            store.insert(run_id, {"action": "export_chat", "status": status, "created_at": "2025-06-01"})
+        store.update("dead", {"owner": f"{store._BOOT_ID}:{_dead_pid()}"})
+        store.update("old-boot", {"owner": f"previous-boot:{os.getpid()}"})
+
+        assert store.fail_orphaned("Interrupted", "2025-06-02") == 2
+
+        assert store.get("live")["status"] == "running"
+        assert store.get("done")["status"] == "completed"
+        for run_id in ("dead", "old-boot"):
+            run = store.get(run_id)
+            assert run["status"] == "failed"
+            assert run["error"] == "Interrupted"
+            assert run["completed_at"] == "2025-06-02"
+
+    def test_adds_owner_column_to_existing_database(self, store):
+        """Test that a database from before owners were recorded is migrated."""
+        import sqlite3
+
+        conn = sqlite3.connect(store.DB_PATH)
+        conn.execute(
+            "CREATE TABLE runs (run_id TEXT PRIMARY KEY, action TEXT NOT NULL, "
+            "status TEXT NOT NULL, progress INTEGER NOT NULL DEFAULT 0, progress_message TEXT, "
+            "created_at TEXT NOT NULL, completed_at TEXT, error TEXT, result_file TEXT, "
+            "params TEXT, summary TEXT, grid_data TEXT, grid_total INTEGER)"
+        )
+        conn.execute("INSERT INTO runs (run_id, action, status, created_at) VALUES ('legacy', 'export_chat', 'running', '2025-06-01')")
+        conn.commit()
+        conn.close()
+
+        assert store.fail_orphaned("Interrupted", "2025-06-02") == 1
+        assert store.get("legacy")["status"] == "failed"
@@ -4,9 +4,11 @@ import pytest
 from unittest.mock import Mock, MagicMock
 from cli.teams_chat_export import (
     get_user_by_identifier,
+    get_users_by_identifiers,
     find_chats_by_participants,
     NotFoundError,
-    TeamsExportError
+    TeamsExportError,
+    UserCache
 )
 
 
@@ -64,7 +66,18 @@ class TestUserResolution:
         # Should return exact match
         assert result["id"] == "user123"
         assert result["displayName"] == "Test User"
-    
+
+    def test_get_user_by_identifier_null_display_name(self):
+        """Test exact UPN matching when another result has no display name."""
+        client = Mock()
+        client.verbose = False
+        client.search_users.return_value = [
+            {"id": "user1", "displayName": None, "userPrincipalName": "svc@example.com"},
+            {"id": "user2", "displayName": "Test", "userPrincipalName": "test@example.com"}
+        ]
+
+        assert get_user_by_identifier(client, "TEST@example.com")["id"] == "user2"
+
     def test_get_user_by_identifier_ambiguous(self):
         """Test resolving user with ambiguous matches."""
         client = Mock()
@@ -88,80 +101,157 @@ class TestUserResolution:
         assert "Multiple users found" in str(exc_info.value)
         assert "john.smith@example.com" in str(exc_info.value)
 
+    def test_get_users_by_identifiers_uses_cache(self, tmp_path):
+        """Test cached identifiers are not searched again."""
+        client = Mock()
+        client.verbose = False
+        user = {"id": "user1", "displayName": "Test User", "userPrincipalName": "test@example.com"}
+        client.search_users_bulk.return_value = {"Test User": [user]}
+        cache = UserCache(str(tmp_path / "users.db"), "tenant1")
+
+        assert get_users_by_identifiers(client, ["Test User"], cache) == [user]
+        assert get_users_by_identifiers(client, ["test user"], cache) == [user]
+
+        client.search_users_bulk.assert_called_once_with(["Test User"])
+        # Entries are scoped to the tenant
+        assert UserCache(str(tmp_path / "users.db"), "tenant2").get("Test User") is None
+
 
 class TestChatDiscovery:
     """Test chat discovery functionality."""
-    
-    def test_find_chats_by_participants_single_match(self):
-        """Test finding chat with matching participants."""
+
+    @staticmethod
+    def _client(chats, members_by_chat):
+        """Mock client whose $batch member lookups are served from a dict."""
         client = Mock()
         client.verbose = False
-        
-        # Mock get_my_chats
-        client.get_my_chats.return_value = [
-            {"id": "chat1", "chatType": "oneOnOne"},
-            {"id": "chat2", "chatType": "group"}
-        ]
-        
-        # Mock get_chat_members
-        def mock_get_members(chat_id):
-            if chat_id == "chat1":
-                return [
+        client.get_my_chats.return_value = chats
+        client.get_chat_members_batch.side_effect = lambda chat_ids: {
+            chat_id: members_by_chat[chat_id] for chat_id in chat_ids
+        }
+        return client
+
+    def test_find_chats_by_participants_single_match(self):
+        """Test finding chat with matching participants."""
+        client = self._client(
+            [
+                {"id": "chat1", "chatType": "oneOnOne"},
+                {"id": "chat2", "chatType": "group"}
+            ],
+            {
+                "chat1": [
                     {"userId": "user1", "displayName": "User 1"},
                     {"userId": "user2", "displayName": "User 2"}
-                ]
-            else:
-                return [
+                ],
+                "chat2": [
                     {"userId": "user1", "displayName": "User 1"},
                     {"userId": "user3", "displayName": "User 3"}
                 ]
-        
-        client.get_chat_members.side_effect = mock_get_members
-        
+            }
+        )
+
         # Find chats with user1 and user2
         result = find_chats_by_participants(client, ["user1", "user2"])
-        
+
         assert len(result) == 1
         assert result[0]["id"] == "chat1"
         assert "members" in result[0]
-    
+
     def test_find_chats_by_participants_no_match(self):
         """Test finding chat with no matching participants."""
-        client = Mock()
-        client.verbose = False
-        
-        client.get_my_chats.return_value = [
-            {"id": "chat1", "chatType": "oneOnOne"}
-        ]
-        
-        client.get_chat_members.return_value = [
-            {"userId": "user1", "displayName": "User 1"},
-            {"userId": "user2", "displayName": "User 2"}
-        ]
-        
+        client = self._client(
+            [{"id": "chat1", "chatType": "oneOnOne"}],
+            {
+                "chat1": [
+                    {"userId": "user1", "displayName": "User 1"},
+                    {"userId": "user2", "displayName": "User 2"}
+                ]
+            }
+        )
+
         # Find chats with user3 and user4 (not in any chat)
         result = find_chats_by_participants(client, ["user3", "user4"])
-        
+
         assert len(result) == 0
-    
+
     def test_find_chats_by_participants_multiple_matches(self):
         """Test finding multiple chats with matching participants."""
-        client = Mock()
-        client.verbose = False
-        
-        client.get_my_chats.return_value = [
-            {"id": "chat1", "chatType": "group"},
-            {"id": "chat2", "chatType": "group"}
-        ]
-        
         # Both chats have user1 and user2
-        client.get_chat_members.return_value = [
+        members = [
             {"userId": "user1", "displayName": "User 1"},
             {"userId": "user2", "displayName": "User 2"},
             {"userId": "user3", "displayName": "User 3"}
         ]
-        
+        client = self._client(
+            [
+                {"id": "chat1", "chatType": "group"},
+                {"id": "chat2", "chatType": "group"}
+            ],
+            {"chat1": members, "chat2": members}
+        )
+
         result = find_chats_by_participants(client, ["user1", "user2"])
-        
+
         assert len(result) == 2
+        # Both lookups share one $batch request
+        client.get_chat_members_batch.assert_called_once_with(["chat1", "chat2"])
+
+    def test_find_chats_by_participants_uses_inline_members(self):
+        """Members listed with the chat are used without a member request."""
+        client = self._client(
+            [
+                {"id": "chat1", "chatType": "group", "members": [{"userId": "user1"}, {"userId": "user2"}]},
+                {"id": "chat2", "chatType": "group", "members": [{"userId": "user1"}]}
+            ],
+            {}
+        )
+
+        result = find_chats_by_participants(client, ["user1", "user2"])
+
+        assert [c["id"] for c in result] == ["chat1"]
+        client.get_chat_members_batch.assert_not_called()
+        assert client.get_my_chats.call_args.kwargs["expand_members"] is True
+
+    def test_find_chats_by_participants_member_error_raised(self):
+        """A chat whose members cannot be read fails the search."""
+        client = self._client(
+            [{"id": "chat1", "chatType": "group"}],
+            {"chat1": NotFoundError("Resource not found")}
+        )
+
+        with pytest.raises(NotFoundError):
+            find_chats_by_participants(client, ["user1", "user2"])
+
+    def test_find_chats_by_participants_skips_one_on_one_for_groups(self):
+        """1:1 chats are not fetched when more than two participants are requested."""
+        client = self._client(
+            [
+                {"id": "chat1", "chatType": "oneOnOne"},
+                {"id": "chat2", "chatType": "group"}
+            ],
+            {
+                "chat2": [
+                    {"userId": "user1", "displayName": "User 1"},
+                    {"userId": "user2", "displayName": "User 2"},
+                    {"userId": "user3", "displayName": "User 3"}
+                ]
+            }
+        )
+
+        result = find_chats_by_participants(client, ["user1", "user2", "user3"])
+
+        assert [c["id"] for c in result] == ["chat2"]
+        client.get_chat_members_batch.assert_called_once_with(["chat2"])
+
+    def test_find_chats_by_participants_leaves_input_chats_unchanged(self):
+        """Matching chats are returned as copies with members attached."""
+        chats = [{"id": "chat1", "chatType": "group"}, {"id": "chat2", "chatType": "group"}]
+        client = self._client(
+            chats,
+            {"chat1": [{"userId": "user1"}, {"userId": "user2"}], "chat2": [{"userId": "user3"}]}
+        )
+
+        result = find_chats_by_participants(client, ["user1", "user2"])
 
+        assert result == [{"id": "chat1", "chatType": "group", "members": [{"userId": "user1"}, {"userId": "user2"}]}]
+        assert all("members" not in chat for chat in chats)
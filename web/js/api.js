@@ -14,7 +14,7 @@ const BASE = (typeof window !== "undefined" && window.API_BASE)
   ? `${window.API_BASE}/api`
   : "/api";
 
-async function _request(method, path, body = null) {
+async function _fetch(method, path, body = null) {
   const opts = {
     method,
     headers: { "Content-Type": "application/json" },
@@ -33,6 +33,11 @@ async function _request(method, path, body = null) {
     }
     throw new Error(detail);
   }
+  return res;
+}
+
+async function _request(method, path, body = null) {
+  const res = await _fetch(method, path, body);
   // Handle 204 No Content
   if (res.status === 204) return {};
   return res.json();
@@ -78,6 +83,16 @@ export function getRunStatus(runId) {
   return _request("GET", `/runs/${runId}/status`);
 }
 
+/**
+ * Like getRunStatus, but also returns the server's suggested delay before
+ * the next poll (X-Poll-Interval-Ms), or null when the header is absent.
+ */
+export async function getRunStatusWithHint(runId) {
+  const res = await _fetch("GET", `/runs/${runId}/status`);
+  const hint = parseInt(res.headers.get("X-Poll-Interval-Ms"), 10);
+  return { status: await res.json(), pollMs: Number.isFinite(hint) ? hint : null };
+}
+
 export function getRunResults(runId) {
   return _request("GET", `/runs/${runId}/results`);
 }
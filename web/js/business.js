@@ -104,6 +104,9 @@ function _startPolling(flowId) {
       } else if (res.status === "error") {
         stopLoginPoll();
         _emit("auth:error", { error: res.error || "Login failed" });
+      } else if (res.error) {
+        // Still pending, but the last poll could not reach Azure AD
+        console.warn("[business] poll network error:", res.error);
       }
       // "pending" → keep polling
     } catch (e) {
@@ -125,7 +128,10 @@ export function getCachedAuth() {
 
 // ── Run management ────────────────────────────────────────────────────────
 
-const _runPollers = new Map(); // run_id → intervalId
+const _runPollers = new Map(); // run_id → timeoutId
+
+// Used until the server supplies an X-Poll-Interval-Ms hint.
+const RUN_POLL_DEFAULT_MS = 1500;
 
 /**
  * Launch an action.  Returns the run object.
@@ -157,17 +163,22 @@ export async function startRun(action, params) {
 function _beginStatusPolling(runId) {
   // Clear existing poller for this run
   if (_runPollers.has(runId)) {
-    clearInterval(_runPollers.get(runId));
+    clearTimeout(_runPollers.get(runId));
   }
 
-  const id = setInterval(async () => {
+  const schedule = (delayMs) => {
+    _runPollers.set(runId, setTimeout(tick, delayMs));
+  };
+
+  const tick = async () => {
+    let nextMs = RUN_POLL_DEFAULT_MS;
     try {
-      const status = await api.getRunStatus(runId);
+      const { status, pollMs } = await api.getRunStatusWithHint(runId);
+      if (pollMs !== null) nextMs = pollMs;
       store.upsertRun({ run_id: runId, ...status });
       _emit("run:progress", { run_id: runId, ...status });
 
       if (status.status === "completed" || status.status === "failed" || status.status === "cancelled") {
-        clearInterval(id);
         _runPollers.delete(runId);
 
         if (status.status === "completed") {
@@ -182,13 +193,15 @@ function _beginStatusPolling(runId) {
         } else {
           _emit("run:failed", { run_id: runId, ...status });
         }
+        return;
       }
     } catch (e) {
       console.warn("[business] status poll error:", e);
     }
-  }, 1500);
+    schedule(nextMs);
+  };
 
-  _runPollers.set(runId, id);
+  schedule(RUN_POLL_DEFAULT_MS);
 }
 
 /**